@@ -1,473 +1,423 @@
-from flask import Flask, request, jsonify
+import hashlib
+import json
+import logging
+import os
+from collections import namedtuple
+
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-from pyswip import Prolog
+
+from caches import ResponseCache
+from disk_cache import DiskCache
+from engine import PrologQueryError
+from fastjson import FastJSONProvider, choose_encoding, compress_body, compress_response
+from verifier import (ENGINE_MODES, FORMAT_VERSION, Verifier, build_compact, build_fsm,
+                      build_verdict, build_verification, iter_verification)
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)
 
-prolog = Prolog()
-prolog.consult("rules.pl")
-
-def reset_world_state():
-    """Reset Prolog world to initial state before each verification."""
-    # Clear any previous world facts
-    list(prolog.query("retractall(world(_))"))
-    # Initial world facts
-    list(prolog.query("assertz(world(powered_off))"))
-    list(prolog.query("assertz(world(battery_full))"))
-    list(prolog.query("assertz(world(object_detected))"))
-
-def get_missing_preconditions(action_atom):
-    """Ask Prolog which preconditions are missing for a given action."""
-    query = (
-        f"findall(Cond, "
-        f"   (precondition('{action_atom}', Cond), \\+ world(Cond)), "
-        f"   Missing)"
-    )
-    res = list(prolog.query(query))
-    if not res:
-        return []
-    missing = res[0]["Missing"]
-    # Convert bytes/atoms to strings
-    out = []
-    for m in missing:
-        if isinstance(m, bytes):
-            out.append(m.decode("utf-8"))
-        else:
-            out.append(str(m))
-    return out
-
-def get_final_world_state():
-    """Return current world/1 facts as a list of strings."""
-    res = list(prolog.query("findall(S, world(S), States)."))
-    if not res:
-        return []
-    states = res[0]["States"]
-    out = []
-    for s in states:
-        if isinstance(s, bytes):
-            out.append(s.decode("utf-8"))
-        else:
-            out.append(str(s))
-    return out
+# Responses at least this many bytes are gzip/deflate encoded for clients
+# that accept it
+COMPRESS_MIN_SIZE = int(os.environ.get("FV_COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_LEVEL = int(os.environ.get("FV_COMPRESS_LEVEL", "6"))
+
+# Default engine, see verifier.ENGINE_MODES. Requests may override it.
+ENGINE_MODE = os.environ.get("FV_ENGINE", "table")
+
+# Number of Prolog worker processes (defaults to one per core)
+PROLOG_WORKERS = int(os.environ.get("FV_PROLOG_WORKERS", "0")) or None
+
+# Steps already computed by the Prolog engines, see Verifier.prolog_traces()
+MEMO_SIZE = int(os.environ.get("FV_MEMO_SIZE", "4096"))
+
+# Verified prefixes for /verify to resume from, see Verifier.events()
+TRIE_NODES = int(os.environ.get("FV_TRIE_NODES", "20000"))
+
+# Encoded /verify and /fsm bodies, bounded by total size and age in seconds
+RESPONSE_CACHE_BYTES = int(os.environ.get("FV_RESPONSE_CACHE_BYTES", str(32 * 1024 * 1024)))
+RESPONSE_CACHE_AGE = float(os.environ.get("FV_RESPONSE_CACHE_AGE", "300"))
+response_cache = ResponseCache(RESPONSE_CACHE_BYTES, RESPONSE_CACHE_AGE)
+
+# Optional SQLite file keeping responses and compiled tables across restarts
+DISK_CACHE_PATH = os.environ.get("FV_DISK_CACHE")
+DISK_CACHE_BYTES = int(os.environ.get("FV_DISK_CACHE_BYTES", str(256 * 1024 * 1024)))
+disk_cache = (DiskCache(DISK_CACHE_PATH, DISK_CACHE_BYTES, FORMAT_VERSION)
+              if DISK_CACHE_PATH else None)
+
+# The routes below are thin HTTP wrappers over this verifier
+verifier = Verifier(engine=ENGINE_MODE, workers=PROLOG_WORKERS, memo_size=MEMO_SIZE,
+                    trie_nodes=TRIE_NODES, disk_cache=disk_cache)
+
+def get_engine(data):
+    """Read the engine mode from a request payload."""
+    engine = data.get("engine", ENGINE_MODE)
+    if engine not in ENGINE_MODES:
+        return None
+    return engine
+
+def read_flag(data, name, default=False):
+    """Read a boolean option from a request payload.
+
+    Raises RequestError unless it is missing or a JSON true/false, so a
+    string like "false" is not taken as true.
+    """
+    value = data.get(name, default)
+    if not isinstance(value, bool):
+        raise RequestError(f"{name} must be true or false")
+    return value
+
+@app.after_request
+def compress(response):
+    """Compress large responses for clients that accept it."""
+    return compress_response(response, request.accept_encodings,
+                             COMPRESS_MIN_SIZE, COMPRESS_LEVEL)
 
 @app.route("/", methods=["GET"])
 def home():
     return "Formal Verification Server is running"
 
-@app.route("/fsm", methods=["POST"])
-def get_fsm():
-    """Get FSM visualization data for an action sequence."""
-    data = request.get_json()
-    
-    # Handle both string and list format
-    if isinstance(data.get("actions"), str):
-        actions_raw = data["actions"]
-        actions = [a.strip() for a in actions_raw.strip("[]").split(",")]
-    elif isinstance(data.get("actions"), list):
-        actions = [str(a).strip().lower() for a in data["actions"]]
-    else:
-        return jsonify({"error": "Actions must be a string or list"}), 400
-    
-    # Reset world state
-    reset_world_state()
-    
-    # Reuse verification logic but return only FSM data
-    fsm_nodes = []
-    fsm_edges = []
-    current_state = get_current_world_state()
-    state_id_map = {}
-    node_counter = 0
-    
-    # Create initial state node
-    initial_label = state_to_label(current_state)
-    state_id_map[frozenset(current_state)] = node_counter
-    fsm_nodes.append({
-        "id": node_counter,
-        "label": f"S{node_counter}: {initial_label}",
-        "state": sorted(list(current_state)),
-        "step": 0,
-        "type": "initial"
-    })
-    node_counter += 1
-    
-    for step, action in enumerate(actions, 1):
-        action_atom = action.strip().lower()
-        from_state_id = state_id_map.get(frozenset(current_state))
-        
-        # Check if action exists
-        action_check = list(prolog.query(f"action('{action_atom}')."))
-        if not action_check:
-            continue
-        
-        # Get all preconditions
-        precondition_query = list(prolog.query(f"precondition('{action_atom}', Cond)."))
-        preconditions = []
-        for item in precondition_query:
-            cond = item["Cond"]
-            if isinstance(cond, bytes):
-                preconditions.append(cond.decode("utf-8"))
-            else:
-                preconditions.append(str(cond))
-        
-        # Validate using Prolog (which applies state changes)
-        query = f"validate('{action_atom}', Result)."
-        try:
-            res_list = list(prolog.query(query))
-            if res_list:
-                result = res_list[0]["Result"]
-                if isinstance(result, bytes):
-                    result = result.decode("utf-8")
-                is_valid = (result == "valid")
-            else:
-                is_valid = False
-        except Exception:
-            is_valid = False
-        
-        # Get new state from Prolog
-        new_state = get_current_world_state()
-        
-        # Create or get state node
-        state_key = frozenset(new_state)
-        if state_key not in state_id_map:
-            state_id_map[state_key] = node_counter
-            state_label = state_to_label(new_state)
-            fsm_nodes.append({
-                "id": node_counter,
-                "label": f"S{node_counter}: {state_label}",
-                "state": sorted(list(new_state)),
-                "step": step,
-                "type": "valid" if is_valid else "invalid"
-            })
-            node_counter += 1
-        
-        to_state_id = state_id_map[state_key]
-        
-        # Create edge
-        fsm_edges.append({
-            "from": from_state_id,
-            "to": to_state_id,
-            "label": action_atom,
-            "action": action_atom,
-            "step": step,
-            "valid": is_valid,
-            "precondition": ", ".join(preconditions) if preconditions else "N/A"
-        })
-        
-        current_state = new_state
-    
+@app.route("/stats", methods=["GET"])
+def stats():
+    """Report cache counters, for sizing the caches."""
     return jsonify({
-        "nodes": fsm_nodes,
-        "edges": fsm_edges
+        **verifier.stats(),
+        "response_cache": response_cache.stats(),
+        "disk_cache": disk_cache.stats() if disk_cache is not None else None
     })
 
-def get_initial_world_state():
-    """Get initial world state as a set of conditions."""
-    world_query = list(prolog.query("world(Cond)."))
-    state = set()
-    for item in world_query:
-        cond = item["Cond"]
-        if isinstance(cond, bytes):
-            state.add(cond.decode("utf-8"))
-        else:
-            state.add(str(cond))
-    return state
-
-def get_current_world_state():
-    """Get current Prolog world state as a set."""
-    return get_initial_world_state()  # Same function, but gets current state from Prolog
-
-def state_to_label(state_set):
-    """Convert state set to a readable label."""
-    if not state_set:
-        return "Initial"
-    # Sort for consistent labeling
-    sorted_states = sorted(state_set)
-    return ", ".join(sorted_states)
-
-def auto_expand_sequence(actions, manual_objects=None, robot_start_pos=(1.0, 1.0)):
-    """Automatically add moveforward actions to reach objects.
-    
-    Args:
-        actions: List of action strings
-        manual_objects: List of (x, y) tuples for manually placed objects
-        robot_start_pos: Starting position of robot (x, y)
+def response_key(endpoint, action_atoms, engine, rules_version):
+    """Hash the parts of a request that decide its response.
+
+    `action_atoms` is the sequence after prepare_actions(), so manual
+    objects and the auto-expand flag are accounted for. The same sequence
+    and engine under the same rules and FORMAT_VERSION always give the same
+    body, so the key doubles as the response's ETag.
     """
-    expanded = []
-    i = 0
-    robot_x, robot_y = robot_start_pos
-    
-    while i < len(actions):
-        expanded.append(actions[i])
-        current = actions[i].strip().lower()
-        
-        # Update robot position based on actions
-        if current == "moveforward":
-            robot_y += 1.5  # Move forward increases Y by 1.5
-        elif current == "moveleft":
-            robot_x -= 1.5  # Move left decreases X by 1.5
-        elif current == "moveright":
-            robot_x += 1.5  # Move right increases X by 1.5
-        
-        # Check if next action is pickobject
-        if i < len(actions) - 1:
-            next_action = actions[i + 1].strip().lower()
-            
-            if next_action == "pickobject":
-                # Check if we have manual objects to reach
-                if manual_objects:
-                    # Find nearest manual object
-                    nearest_obj = None
-                    min_dist = float('inf')
-                    for obj_x, obj_y in manual_objects:
-                        dist = ((obj_x - robot_x)**2 + (obj_y - robot_y)**2)**0.5
-                        if dist < min_dist:
-                            min_dist = dist
-                            nearest_obj = (obj_x, obj_y)
-                    
-                    if nearest_obj:
-                        obj_x, obj_y = nearest_obj
-                        # Calculate movement needed in both X and Y directions
-                        dist_x = obj_x - robot_x
-                        dist_y = obj_y - robot_y
-                        
-                        # Move in X direction first (left/right)
-                        if abs(dist_x) > 0.5:
-                            if dist_x > 0:  # Need to move right
-                                steps_x = max(1, int((dist_x - 1.0) / 1.5) + 1)
-                                for _ in range(min(steps_x, 5)):  # Max 5 steps
-                                    expanded.append("moveright")
-                                    robot_x += 1.5
-                                    if abs(obj_x - robot_x) <= 1.0:
-                                        break
-                            else:  # Need to move left
-                                steps_x = max(1, int((abs(dist_x) - 1.0) / 1.5) + 1)
-                                for _ in range(min(steps_x, 5)):  # Max 5 steps
-                                    expanded.append("moveleft")
-                                    robot_x -= 1.5
-                                    if abs(obj_x - robot_x) <= 1.0:
-                                        break
-                        
-                        # Then move in Y direction (forward)
-                        if dist_y > 0.5:  # Need to move forward
-                            steps_y = max(1, int((dist_y - 1.0) / 1.5) + 1)
-                            for _ in range(min(steps_y, 5)):  # Max 5 steps
-                                expanded.append("moveforward")
-                                robot_y += 1.5
-                                if abs(obj_y - robot_y) <= 1.0:
-                                    break
-                elif current == "scanarea":
-                    # Original behavior: add movement after scanarea if no manual objects
-                    expanded.append("moveforward")
-                    expanded.append("moveforward")
-        
-        i += 1
-    return expanded
+    canonical = json.dumps({
+        "format": FORMAT_VERSION,
+        "endpoint": endpoint,
+        "actions": action_atoms,
+        "engine": engine,
+        "rules": rules_version
+    }, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
-@app.route("/verify", methods=["POST"])
-def verify():
-    data = request.get_json()
-    
+class RequestError(ValueError):
+    """A malformed request payload, answered with 400 and the message."""
+
+# A planned /verify or /fsm response: its cache key (also its ETag), the
+# rules version it is computed under and build(guard), which computes the
+# body and passes every trace or event stream it reads through guard()
+Job = namedtuple("Job", "key rules_version build")
+
+def cached_body(key):
+    """Return the encoded body cached under `key` in memory or on disk, or None."""
+    body = response_cache.get(key)
+    if body is None:
+        body = disk_body(key)
+    return body
+
+def disk_body(key):
+    """Return the encoded body cached under `key` on disk, or None.
+
+    A body found there is copied into the memory cache.
+    """
+    if disk_cache is None:
+        return None
+    body = disk_cache.get_response(key)
+    if body is not None:
+        response_cache.put(key, body)
+    return body
+
+def store_body(key, rules_version, body):
+    """Cache an encoded body in memory and on disk."""
+    response_cache.put(key, body)
+    if disk_cache is not None:
+        disk_cache.put_response(key, rules_version, body)
+
+def compressed_body(key, body, encoding):
+    """Return `body` compressed with `encoding`, cached next to it under `key`."""
+    encoded = response_cache.get_encoded(key, encoding)
+    if encoded is None:
+        encoded = compress_body(body, encoding, COMPRESS_LEVEL)
+        response_cache.put_encoded(key, encoding, encoded)
+    return encoded
+
+def encode_json(body):
+    """Encode a response body exactly as jsonify() does."""
+    return app.json.response(body).get_data()
+
+def cached_json(job):
+    """Return a JSON response for a Job through the response caches.
+
+    Answers 304 when the client already holds the body (its key sent in
+    If-None-Match), otherwise serves the cached encoding from memory or
+    disk, or builds the body and caches it. Large bodies are compressed
+    here, once per encoding, instead of by the compress() hook.
+    """
+    if request.if_none_match.contains_weak(job.key):
+        response = Response(status=304)
+        response.set_etag(job.key)
+        return response
+
+    body = cached_body(job.key)
+    if body is None:
+        body = encode_json(job.build(iter))
+        store_body(job.key, job.rules_version, body)
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None or len(body) < COMPRESS_MIN_SIZE:
+        response = Response(body, mimetype="application/json")
+        response.set_etag(job.key)
+        return response
+    response = Response(compressed_body(job.key, body, encoding), mimetype="application/json")
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    # The encoded body differs byte for byte, see compress_response()
+    response.set_etag(job.key, weak=True)
+    return response
+
+def read_sequence_request(data, auto_expand_default=True):
+    """Read the actions and engine of a /verify or /fsm payload.
+
+    Raises RequestError if either is malformed.
+    """
+    if not isinstance(data, dict):
+        raise RequestError("Request body must be a JSON object")
+    actions = prepare_actions(data, auto_expand_default)
+    if actions is None:
+        raise RequestError("Actions must be a string or list")
+    engine = get_engine(data)
+    if engine is None:
+        raise RequestError(f"Engine must be one of: {', '.join(ENGINE_MODES)}")
+    return actions, engine
+
+def fsm_job(data):
+    """Plan the /fsm response for a payload, see Job."""
+    actions, engine = read_sequence_request(data, auto_expand_default=False)
+    table = verifier.table
+    response_cache.check_version(table.rules_version)
+    key = response_key("fsm", actions, engine, table.rules_version)
+    return Job(key, table.rules_version,
+               lambda guard: build_fsm(guard(verifier.events(actions, engine))))
+
+def verify_job(data):
+    """Plan the /verify response for a payload, see Job and verify()."""
+    actions, engine = read_sequence_request(data)
+    output = data.get("format", "full")
+    if output not in ("full", "compact", "verdict"):
+        raise RequestError("Format must be 'full', 'compact' or 'verdict'")
+    explain = read_flag(data, "explain")
+    fail_fast = read_flag(data, "fail_fast")
+
+    table = verifier.table
+    response_cache.check_version(table.rules_version)
+    if output == "verdict":
+        # Skips the trie and every event, only results are looked at
+        def build(guard):
+            _, trace = verifier.trace(actions, engine, lazy=fail_fast)
+            return build_verdict(guard(trace), fail_fast)
+        key = response_key(f"verify:verdict:{fail_fast}", actions, engine, table.rules_version)
+        return Job(key, table.rules_version, build)
+    if output == "compact":
+        key = response_key(f"verify:compact:{explain}", actions, engine, table.rules_version)
+        return Job(key, table.rules_version,
+                   lambda guard: build_compact(guard(verifier.events(actions, engine)), explain))
+    key = response_key("verify", actions, engine, table.rules_version)
+    return Job(key, table.rules_version,
+               lambda guard: build_verification(guard(verifier.events(actions, engine))))
+
+@app.errorhandler(PrologQueryError)
+def prolog_query_failed(e):
+    """rules.pl could not verify a sequence, see prolog_trace()."""
+    return jsonify({"error": str(e)}), 500
+
+@app.route("/fsm", methods=["POST"])
+def get_fsm():
+    """Get FSM visualization data for an action sequence.
+
+    The same view of the verification as the "fsm" part of /verify, and
+    served from the same prefix trie. Sequences are only auto-expanded if
+    "auto_expand" is set.
+    """
+    try:
+        return cached_json(fsm_job(request.get_json()))
+    except RequestError as e:
+        return jsonify({"error": str(e)}), 400
+
+def parse_actions(data):
+    """Read the action list from a request payload, or None if malformed."""
     # Handle both string format "[A, B, C]" and list format
     if isinstance(data.get("actions"), str):
         actions_raw = data["actions"]
-        actions = [a.strip() for a in actions_raw.strip("[]").split(",")]
+        return [a.strip() for a in actions_raw.strip("[]").split(",")]
     elif isinstance(data.get("actions"), list):
-        actions = [str(a).strip().lower() for a in data["actions"]]
-    else:
-        return jsonify({"error": "Actions must be a string or list"}), 400
+        return [str(a).strip().lower() for a in data["actions"]]
+    return None
+
+def prepare_actions(data, auto_expand_default=True):
+    """Parse a payload's actions and auto-expand them if requested.
+
+    Returns the list of action atoms to verify, or None if malformed.
+    """
+    actions = parse_actions(data)
+    if actions is None:
+        return None
 
     # Get manual objects from request (if provided)
     manual_objects = data.get("manual_objects", [])
     
     # Auto-expand sequence: add movement to reach objects
-    auto_expand = data.get("auto_expand", True)  # Default to True
-    if auto_expand:
-        actions = auto_expand_sequence(actions, manual_objects=manual_objects)
+    auto_expand = data.get("auto_expand", auto_expand_default)
+    return verifier.expand(actions, manual_objects, auto_expand)
 
-    # Reset world state before verification
-    reset_world_state()
+def stream_verification(events):
+    """Yield iter_verification() events as NDJSON lines, one per event.
 
-    results = []
-    all_valid = True
-    
-    # Battery tracking
-    battery_level = 100
-    battery_history = []
-    
-    # FSM tracking
-    fsm_nodes = []
-    fsm_edges = []
-    current_state = get_current_world_state()  # Start with initial Prolog world state
-    state_id_map = {}  # Map state sets to node IDs
-    node_counter = 0
-    
-    # Create initial state node
-    initial_label = state_to_label(current_state)
-    state_id_map[frozenset(current_state)] = node_counter
-    fsm_nodes.append({
-        "id": node_counter,
-        "label": f"S{node_counter}: {initial_label}",
-        "state": sorted(list(current_state)),
-        "step": 0,
-        "type": "initial"
-    })
-    node_counter += 1
-
-    for step, action in enumerate(actions, 1):
-        action_atom = action.strip().lower()
-        from_state_id = state_id_map.get(frozenset(current_state))
-        
-        # Store state BEFORE action (for from_state in results)
-        from_state_before = get_current_world_state()  # Get from Prolog
-        from_state_list = sorted(list(from_state_before))
-        
-        # Check if action exists
-        action_check = list(prolog.query(f"action('{action_atom}')."))
-        
-        if not action_check:
-            # Invalid action - state doesn't change
-            results.append({
-                "action": action_atom,
-                "result": "invalid_action",
-                "precondition": "N/A",
-                "precondition_met": False,
-                "explanation": f"'{action_atom}' is not a recognized action. Valid actions are: scanarea, moveforward, pickobject.",
-                "from_state": from_state_list,
-                "to_state": from_state_list  # State doesn't change
-            })
-            all_valid = False
+    Lines are {"type": "node", "node": ...}, {"type": "step", "step": n,
+    "validation": ..., "edge": ...} and a final {"type": "summary", ...}.
+    """
+    step = 0
+    for event in events:
+        if event[0] == "step":
+            step += 1
+            line = {"type": "step", "step": step, "validation": event[1], "edge": event[2]}
+        elif event[0] == "node":
+            line = {"type": "node", "node": event[1]}
+        else:
+            line = {"type": "summary", **event[1]}
+        yield app.json.dumps(line) + "\n"
+
+
+@app.route("/verify", methods=["POST"])
+def verify():
+    """Verify an action sequence.
+
+    "format": "compact" returns the delta-encoded body of build_compact()
+    instead of the full one, with explanations only if "explain" is set.
+    "format": "verdict" returns only build_verdict(), and with "fail_fast"
+    stops verifying at the first invalid step. "?stream=ndjson" streams
+    the full body as events instead.
+    """
+    data = request.get_json()
+    try:
+        if request.args.get("stream") == "ndjson":
+            # Resume from the longest prefix verified before
+            actions, engine = read_sequence_request(data)
+            return Response(stream_verification(verifier.events(actions, engine)),
+                            mimetype="application/x-ndjson")
+        return cached_json(verify_job(data))
+    except RequestError as e:
+        return jsonify({"error": str(e)}), 400
+
+def read_batch_request(data):
+    """Read the options of a /verify/batch payload.
+
+    Returns (sequences, output, dedupe, fail_fast, engine). Raises
+    RequestError if the payload is malformed.
+    """
+    if not isinstance(data, dict):
+        raise RequestError("Request body must be a JSON object")
+    sequences = data.get("sequences")
+    if not isinstance(sequences, list):
+        raise RequestError("Sequences must be a list")
+
+    output = data.get("output", "verdict")
+    if output not in ("verdict", "trace"):
+        raise RequestError("Output must be 'verdict' or 'trace'")
+    dedupe = read_flag(data, "dedupe", True)
+    fail_fast = read_flag(data, "fail_fast")
+    if fail_fast and output == "trace":
+        raise RequestError("fail_fast only applies to output 'verdict'")
+
+    engine = get_engine(data)
+    if engine is None:
+        raise RequestError(f"Engine must be one of: {', '.join(ENGINE_MODES)}")
+    return sequences, output, dedupe, fail_fast, engine
+
+@app.route("/verify/batch", methods=["POST"])
+def verify_batch():
+    """Verify many sequences in one request.
+
+    Each entry of "sequences" takes the same "actions", "manual_objects"
+    and "auto_expand" fields as /verify. "output" is "verdict" (default)
+    for a compact summary per sequence or "trace" for the full /verify
+    body. With "dedupe" (default true) identical expanded sequences are
+    only verified once. "fail_fast" stops each verdict at its first invalid
+    step, and on the Prolog engine stops querying that sequence there; it
+    cannot be combined with "trace" output.
+    """
+    try:
+        sequences, output, dedupe, fail_fast, engine = read_batch_request(request.get_json())
+    except RequestError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Expand every sequence first so duplicates can be found
+    prepared = []  # action tuple, or the error message for a malformed entry
+    for seq in sequences:
+        if not isinstance(seq, dict):
+            prepared.append("Each sequence must be an object")
             continue
-        
-        # Get all preconditions for this action
-        precondition_query = list(prolog.query(f"precondition('{action_atom}', Cond)."))
-        preconditions = []
-        for item in precondition_query:
-            cond = item["Cond"]
-            if isinstance(cond, bytes):
-                preconditions.append(cond.decode("utf-8"))
-            else:
-                preconditions.append(str(cond))
-        
-        # Validate using Prolog (which applies state changes dynamically)
-        query = f"validate('{action_atom}', Result)."
-        try:
-            res_list = list(prolog.query(query))
-            if res_list:
-                result = res_list[0]["Result"]
-                if isinstance(result, bytes):
-                    result = result.decode("utf-8")
-            else:
-                result = "invalid_action"
-        except Exception:
-            result = "error_processing"
-        
-        # Check which preconditions are met
-        current_prolog_state = get_current_world_state()
-        missing_preconditions = get_missing_preconditions(action_atom)
-        all_preconditions_met = len(missing_preconditions) == 0
-        
-        # Build explanation
-        if result == "valid":
-            if preconditions:
-                explanation = f"Action '{action_atom}' is valid. All preconditions satisfied: {', '.join(preconditions)}."
-            else:
-                explanation = f"Action '{action_atom}' is valid."
-        elif result == "precondition_failed":
-            if missing_preconditions:
-                explanation = f"Action '{action_atom}' failed. Missing preconditions: {', '.join(missing_preconditions)}."
-            else:
-                explanation = f"Action '{action_atom}' failed: One or more preconditions are not satisfied."
-        elif result == "invalid_action":
-            explanation = f"'{action_atom}' is not a recognized action."
+        actions = prepare_actions(seq)
+        prepared.append(tuple(actions) if actions is not None
+                        else "Actions must be a string or list")
+
+    unique = []  # sequences to verify
+    slots = []  # position in `unique` for each prepared sequence, or an error
+    index_of = {}
+    for actions in prepared:
+        if isinstance(actions, str):
+            slots.append(actions)
+        elif dedupe and actions in index_of:
+            slots.append(index_of[actions])
         else:
-            explanation = f"Action '{action_atom}' resulted in error: {result}."
-        
-        # Get state after action (from Prolog)
-        new_state = get_current_world_state()
-        
-        # Battery tracking
-        if result == "valid":
-            if action_atom in ["moveforward", "moveleft", "moveright", "turnleft", "turnright"]:
-                battery_level = max(0, battery_level - 20)
-            elif action_atom in ["scanarea", "pickobject", "releaseobject"]:
-                battery_level = max(0, battery_level - 10)
-            # poweron, poweroff, checkbattery, stop -> no drain
-        
-        battery_history.append(battery_level)
-        
-        # Update current_state for FSM tracking (from Prolog)
-        current_state = new_state
-        
-        # Create or get state node
-        state_key = frozenset(new_state)
-        if state_key not in state_id_map:
-            state_id_map[state_key] = node_counter
-            state_label = state_to_label(new_state)
-            fsm_nodes.append({
-                "id": node_counter,
-                "label": f"S{node_counter}: {state_label}",
-                "state": sorted(list(new_state)),
-                "step": step,
-                "type": "valid" if result == "valid" else "invalid"
-            })
-            node_counter += 1
-        
-        to_state_id = state_id_map[state_key]
-        
-        # Create edge
-        fsm_edges.append({
-            "from": from_state_id,
-            "to": to_state_id,
-            "label": action_atom,
-            "action": action_atom,
-            "step": step,
-            "valid": result == "valid",
-            "precondition": ", ".join(preconditions) if preconditions else "N/A"
-        })
-        
-        # Store state after transition for result
-        to_state_list = sorted(list(new_state))
-        
-        results.append({
-            "action": action_atom,
-            "result": result,
-            "precondition": ", ".join(preconditions) if preconditions else "N/A",
-            "precondition_met": all_preconditions_met,
-            "explanation": explanation,
-            "from_state": from_state_list,
-            "to_state": to_state_list,
-            "battery": battery_level
-        })
-
-        if result != "valid":
-            all_valid = False
-            
-    summary = "VALID SEQUENCE" if all_valid else "INVALID SEQUENCE"
-    summary_details = f"All {len(actions)} actions are valid." if all_valid else f"Found {sum(1 for r in results if r['result'] != 'valid')} invalid action(s) in the sequence."
-    final_state = get_final_world_state()
+            index_of[actions] = len(unique)
+            slots.append(len(unique))
+            unique.append(actions)
+
+    # Spreads the sequences over the whole pool on the prolog engine
+    table, traces = verifier.traces(unique, engine, fail_fast)
+
+    computed = []
+    for trace in traces:
+        if output == "trace":
+            body = build_verification(iter_verification(table, table.initial_world, trace))
+            computed.append((body, body["summary"] == "VALID SEQUENCE"))
+        else:
+            body = build_verdict(trace, fail_fast)
+            computed.append((body, body["valid"]))
+
+    results = []
+    valid_count = 0
+    for slot in slots:
+        if isinstance(slot, str):
+            results.append({"error": slot})
+            continue
+        body, is_valid = computed[slot]
+        results.append(body)
+        if is_valid:
+            valid_count += 1
 
     return jsonify({
-        "validation": results, 
-        "summary": summary,
-        "summary_details": summary_details,
-        "final_state": final_state,
-        "final_battery": battery_level,
-        "battery_history": battery_history,
-        "fsm": {
-            "nodes": fsm_nodes,
-            "edges": fsm_edges
-        }
+        "results": results,
+        "count": len(results),
+        "valid_count": valid_count,
+        "unique_count": len(unique)
     })
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     print("=" * 50)
     print("Formal Verification Server Starting...")
     print("=" * 50)
     print("Server running on: http://127.0.0.1:5000")
     print("API endpoint: http://127.0.0.1:5000/verify")
+    print("Batch endpoint: http://127.0.0.1:5000/verify/batch")
     print("Press Ctrl+C to stop the server")
     print("=" * 50)
+    # Load the rules and compile the transition table before serving
+    verifier.engines()
     try:
         app.run(host='127.0.0.1', port=5000, debug=False)
     except Exception as e:
@@ -0,0 +1,304 @@
+"""
+Asyncio variant of the verification server.
+
+A plain ASGI application serving /verify and /fsm (same payloads and
+responses as app.py, without NDJSON streaming), / and /stats. Verification
+runs on a bounded thread pool so the event loop stays free: parsing,
+planning, rules reloads and building all happen there. Health checks and
+repeats of a recently planned request body (304s and responses cached in
+memory) are answered right away on the loop while slow or huge requests
+wait for a worker. Each request has a timeout (504), and a request whose
+client disconnects or times out stops verifying at its next step.
+
+    pip install uvicorn
+    python async_app.py              or    uvicorn async_app:application
+
+Environment: FV_ASYNC_WORKERS (engine threads, default 4),
+FV_ASYNC_TIMEOUT (seconds per request, default 30) and FV_ASYNC_MAX_BODY
+(request size limit in bytes), plus the FV_* settings of app.py.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header, parse_etags
+
+import app as backend
+from fastjson import choose_encoding, compress_body
+from verifier import RULES_CHECK_INTERVAL
+
+ASYNC_WORKERS = int(os.environ.get("FV_ASYNC_WORKERS", "4"))
+ASYNC_TIMEOUT = float(os.environ.get("FV_ASYNC_TIMEOUT", "30"))
+MAX_BODY = int(os.environ.get("FV_ASYNC_MAX_BODY", str(16 * 1024 * 1024)))
+
+# Engine calls run here, never on the event loop
+executor = ThreadPoolExecutor(max_workers=ASYNC_WORKERS, thread_name_prefix="verify")
+
+# Requests currently waiting for or running on the executor
+in_flight = 0
+
+# Recently planned requests: (plan name, SHA-256 of the raw body) ->
+# (response key, rules version, time planned). A repeat of the same body is
+# answered from these on the loop without parsing or planning it. Entries
+# are trusted for as long as Verifier.engines() trusts rules.pl unchanged.
+planned = OrderedDict()
+PLANNED_SIZE = 4096
+# Bigger bodies are not hashed on the loop and always go to the executor
+PLANNED_MAX_BODY = 256 * 1024
+
+
+class Cancelled(Exception):
+    """Raised inside a job whose request timed out or was dropped."""
+
+
+def guard_with(cancel):
+    """Return a guard for Job.build() that stops once `cancel` is set."""
+    def guard(items):
+        for item in items:
+            if cancel.is_set():
+                raise Cancelled()
+            yield item
+    return guard
+
+
+async def read_body(receive):
+    """Read the whole request body, or None if it is over MAX_BODY."""
+    chunks = []
+    size = 0
+    more = True
+    while more:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise Cancelled()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY:
+            return None
+        chunks.append(chunk)
+        more = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+async def wait_disconnect(receive):
+    """Return once the client has gone away."""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def send_response(send, status, body=b"", content_type="application/json",
+                        headers=None):
+    raw_headers = [(b"content-length", str(len(body)).encode("latin-1"))]
+    if content_type:
+        raw_headers.append((b"content-type", content_type.encode("latin-1")))
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode("latin-1"), value.encode("latin-1")))
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def send_json(send, status, body, request_headers, etag=None):
+    """Send an encoded JSON body, compressed if large and accepted.
+
+    `etag` is also the body's response cache key, if given.
+    """
+    headers = {}
+    if etag is not None:
+        headers["etag"] = f'"{etag}"'
+    accept = parse_accept_header(request_headers.get("Accept-Encoding"))
+    encoding = choose_encoding(accept)
+    headers["vary"] = "Accept-Encoding"
+    if encoding is not None and len(body) >= backend.COMPRESS_MIN_SIZE:
+        if etag is None:
+            body = await asyncio.get_running_loop().run_in_executor(
+                executor, compress_body, body, encoding, backend.COMPRESS_LEVEL)
+        else:
+            # Cached bodies keep their compressed copies next to them
+            encoded = backend.response_cache.get_encoded(etag, encoding)
+            if encoded is None:
+                encoded = await asyncio.get_running_loop().run_in_executor(
+                    executor, backend.compressed_body, etag, body, encoding)
+            body = encoded
+        headers["content-encoding"] = encoding
+        if etag is not None:
+            headers["etag"] = f'W/"{etag}"'
+    await send_response(send, status, body, headers=headers)
+
+
+def planned_key(digest):
+    """Return the response key planned for a request body, or None if stale."""
+    entry = planned.get(digest)
+    if entry is None:
+        return None
+    key, rules_version, when = entry
+    if (rules_version != backend.response_cache.version
+            or time.monotonic() - when > RULES_CHECK_INTERVAL):
+        del planned[digest]
+        return None
+    planned.move_to_end(digest)
+    return key
+
+
+def remember_plan(digest, job):
+    planned[digest] = (job.key, job.rules_version, time.monotonic())
+    planned.move_to_end(digest)
+    while len(planned) > PLANNED_SIZE:
+        planned.popitem(last=False)
+
+
+async def run_job(plan, raw, etags, receive, timeout, checked=None):
+    """Parse, plan and build a response on the executor.
+
+    Returns (job, body), with body None if `etags` (from If-None-Match)
+    already holds the job's key, or None if the client disconnected.
+    `checked` is a key already looked up in the memory cache. Raises
+    RequestError for a malformed body and asyncio.TimeoutError after
+    `timeout` seconds; either way the job is told to stop.
+    """
+    global in_flight
+    loop = asyncio.get_running_loop()
+    cancel = threading.Event()
+    guard = guard_with(cancel)
+
+    def work():
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            raise backend.RequestError("Request body must be JSON")
+        job = plan(data)
+        if etags.contains_weak(job.key):
+            return job, None
+        if job.key == checked:
+            body = backend.disk_body(job.key)
+        else:
+            body = backend.cached_body(job.key)
+        if body is None:
+            body = backend.encode_json(job.build(guard))
+            backend.store_body(job.key, job.rules_version, body)
+        return job, body
+
+    future = loop.run_in_executor(executor, work)
+    disconnect = asyncio.ensure_future(wait_disconnect(receive))
+    in_flight += 1
+    try:
+        done, _ = await asyncio.wait({future, disconnect}, timeout=timeout,
+                                     return_when=asyncio.FIRST_COMPLETED)
+        if future in done:
+            return future.result()
+        cancel.set()
+        if disconnect in done:
+            return None
+        raise asyncio.TimeoutError()
+    finally:
+        in_flight -= 1
+        disconnect.cancel()
+        if not future.done():
+            # Collect the Cancelled error once the worker stops
+            future.add_done_callback(lambda f: f.exception())
+
+
+async def handle_sequence(plan, receive, send, request_headers):
+    """Serve a /verify or /fsm request planned by backend.verify_job/fsm_job."""
+    try:
+        body = await read_body(receive)
+    except Cancelled:
+        return
+    if body is None:
+        await send_json(send, 413, backend.encode_json({"error": "Request body too large"}),
+                        request_headers)
+        return
+
+    etags = parse_etags(request_headers.get("If-None-Match"))
+    digest = key = None
+    if len(body) <= PLANNED_MAX_BODY:
+        # Cheap repeat check; anything else is parsed on the executor
+        digest = (plan.__name__, hashlib.sha256(body).hexdigest())
+        key = planned_key(digest)
+        if key is not None:
+            if etags.contains_weak(key):
+                await send_response(send, 304, content_type=None, headers={"etag": f'"{key}"'})
+                return
+            encoded = backend.response_cache.get(key)
+            if encoded is not None:
+                await send_json(send, 200, encoded, request_headers, etag=key)
+                return
+    try:
+        result = await run_job(plan, body, etags, receive, ASYNC_TIMEOUT, checked=key)
+    except backend.RequestError as e:
+        await send_json(send, 400, backend.encode_json({"error": str(e)}), request_headers)
+        return
+    except backend.PrologQueryError as e:
+        await send_json(send, 500, backend.encode_json({"error": str(e)}), request_headers)
+        return
+    except asyncio.TimeoutError:
+        await send_json(send, 504, backend.encode_json(
+            {"error": f"Verification took longer than {ASYNC_TIMEOUT:g}s"}), request_headers)
+        return
+    if result is None:
+        return  # client went away, nobody to answer
+
+    job, encoded = result
+    if digest is not None:
+        remember_plan(digest, job)
+    if encoded is None:
+        await send_response(send, 304, content_type=None, headers={"etag": f'"{job.key}"'})
+        return
+    await send_json(send, 200, encoded, request_headers, etag=job.key)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # Compile the rules before taking requests
+            await asyncio.get_running_loop().run_in_executor(executor, backend.verifier.engines)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            executor.shutdown(wait=False)
+            backend.verifier.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    """ASGI entry point."""
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    method = scope["method"]
+    path = scope["path"]
+    request_headers = Headers([(k.decode("latin-1"), v.decode("latin-1"))
+                               for k, v in scope["headers"]])
+
+    if path == "/" and method == "GET":
+        await send_response(send, 200, b"Formal Verification Server is running",
+                            content_type="text/plain; charset=utf-8")
+    elif path == "/stats" and method == "GET":
+        stats = {**backend.verifier.stats(),
+                 "response_cache": backend.response_cache.stats(),
+                 "executor": {"workers": ASYNC_WORKERS, "in_flight": in_flight}}
+        await send_json(send, 200, backend.encode_json(stats), request_headers)
+    elif path == "/verify" and method == "POST":
+        await handle_sequence(backend.verify_job, receive, send, request_headers)
+    elif path == "/fsm" and method == "POST":
+        await handle_sequence(backend.fsm_job, receive, send, request_headers)
+    else:
+        await send_json(send, 404, backend.encode_json({"error": "Not found"}), request_headers)
+
+
+if __name__ == "__main__":
+    import logging
+    import uvicorn
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    print("Async verification server on http://127.0.0.1:5000")
+    uvicorn.run(application, host="127.0.0.1", port=5000, lifespan="on")
@@ -0,0 +1,72 @@
+"""
+Benchmark JSON encoding and compression of /verify responses.
+
+Builds /verify bodies (full and compact format) for long action sequences
+and reports encode time with the json module and with orjson, and the
+bytes on the wire with and without gzip/deflate.
+
+Usage: python bench.py [steps ...]    (default: 1000 10000 100000)
+"""
+import gzip
+import json
+import sys
+import time
+import zlib
+
+import app
+import verifier
+from fastjson import orjson
+
+# A plan that keeps cycling through valid and failing steps
+PLAN = ["poweron", "scanarea", "moveforward", "pickobject", "moveleft",
+        "releaseobject", "checkbattery", "pickobject", "poweroff", "moveforward"]
+
+
+def timed(fn, repeat=3):
+    """Return (best time in ms, result) over `repeat` runs."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def build_body(table, actions, output):
+    events = verifier.iter_verification(table, table.initial_world,
+                                        verifier.table_trace(table, actions))
+    if output == "compact":
+        return verifier.build_compact(events)
+    return verifier.build_verification(events)
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [1000, 10000, 100000]
+    table = app.verifier.table
+
+    print(f"orjson: {'installed' if orjson is not None else 'not installed'}")
+    header = (f"{'steps':>7} {'format':>8} {'build ms':>9} {'json ms':>8} {'orjson ms':>10} "
+              f"{'raw KB':>9} {'gzip KB':>8} {'gzip ms':>8} {'deflate KB':>10} {'deflate ms':>10}")
+    print(header)
+    print("-" * len(header))
+    for steps in sizes:
+        actions = (PLAN * (steps // len(PLAN) + 1))[:steps]
+        for output in ("full", "compact"):
+            build_ms, body = timed(lambda: build_body(table, actions, output), repeat=1)
+            json_ms, raw = timed(lambda: json.dumps(
+                body, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+            if orjson is not None:
+                orjson_ms, _ = timed(lambda: orjson.dumps(body, option=orjson.OPT_SORT_KEYS))
+                orjson_col = f"{orjson_ms:10.1f}"
+            else:
+                orjson_col = f"{'-':>10}"
+            gzip_ms, gz = timed(lambda: gzip.compress(raw, compresslevel=app.COMPRESS_LEVEL))
+            deflate_ms, df = timed(lambda: zlib.compress(raw, app.COMPRESS_LEVEL))
+            print(f"{steps:>7} {output:>8} {build_ms:9.1f} {json_ms:8.1f} {orjson_col} "
+                  f"{len(raw) / 1024:9.1f} {len(gz) / 1024:8.1f} {gzip_ms:8.1f} "
+                  f"{len(df) / 1024:10.1f} {deflate_ms:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Caches for the verification backend.
+
+Every cache here is tagged with the rules version (TransitionTable's
+rules_version) it was filled under and empties itself when it sees a
+different one, so an edit to rules.pl never serves stale results.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TransitionMemo:
+    """Bounded LRU cache of single transitions.
+
+    Keyed by (world mask, action). Each entry holds the step's
+    (result, preconditions, missing, next world) as returned by
+    TransitionTable.step().
+    """
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check_version(self, version):
+        """Drop every entry if the rules version changed."""
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+
+    def get(self, world, action_atom):
+        """Return the cached transition, or None."""
+        key = (world, action_atom)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return entry
+
+    def put(self, world, action_atom, entry):
+        """Store a transition that had to be computed (counted as a miss)."""
+        key = (world, action_atom)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class _TrieNode:
+    __slots__ = ("parent", "action", "children", "events", "checkpoint")
+
+    def __init__(self, parent, action, events, checkpoint):
+        self.parent = parent
+        self.action = action
+        self.children = {}
+        self.events = events
+        self.checkpoint = checkpoint
+
+
+class PrefixTrie:
+    """Bounded trie of already-verified action prefixes.
+
+    Each node stands for one step of a sequence. It keeps the events that
+    step produced and a checkpoint (world, battery, FSM node counter, ...)
+    to resume verification from. There is one root per (rules version,
+    engine) key. The root's events are the initial FSM node.
+
+    Nodes are evicted least recently used first. Touching a path from the
+    leaf up keeps every node more recent than its descendants, so the
+    oldest node is always a leaf and whole branches age out tip first.
+    """
+
+    def __init__(self, max_nodes=20000):
+        self.max_nodes = max_nodes
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._roots = {}
+        self._lru = OrderedDict()  # id(node) -> node
+        self._lock = threading.Lock()
+
+    def lookup(self, version, key, action_atoms, make_root):
+        """Find the longest cached prefix of a sequence.
+
+        Returns [root, node1, ...], one node per cached step. make_root()
+        returns (events, checkpoint) for a missing root.
+        """
+        with self._lock:
+            if version != self.version:
+                self._roots.clear()
+                self._lru.clear()
+                self.version = version
+            root = self._roots.get(key)
+            if root is None:
+                events, checkpoint = make_root()
+                root = self._add(None, None, events, checkpoint)
+                self._roots[key] = root
+            path = [root]
+            node = root
+            for action_atom in action_atoms:
+                node = node.children.get(action_atom)
+                if node is None:
+                    break
+                path.append(node)
+            if len(path) > 1:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return path
+
+    def insert(self, parent, action_atom, events, checkpoint):
+        """Add the step after `parent`, or return it if already cached."""
+        with self._lock:
+            node = parent.children.get(action_atom)
+            if node is None:
+                node = self._add(parent, action_atom, events, checkpoint)
+            return node
+
+    def touch(self, path):
+        """Mark a root-to-leaf path as used and evict down to the cap."""
+        with self._lock:
+            for node in reversed(path):
+                if id(node) in self._lru:
+                    self._lru.move_to_end(id(node))
+            while len(self._lru) > self.max_nodes:
+                _, node = self._lru.popitem(last=False)
+                if node.parent is not None:
+                    node.parent.children.pop(node.action, None)
+                else:
+                    self._roots = {k: r for k, r in self._roots.items() if r is not node}
+                self.evictions += 1
+
+    def _add(self, parent, action_atom, events, checkpoint):
+        node = _TrieNode(parent, action_atom, events, checkpoint)
+        if parent is not None:
+            parent.children[action_atom] = node
+        self._lru[id(node)] = node
+        return node
+
+    def stats(self):
+        with self._lock:
+            return {
+                "nodes": len(self._lru),
+                "max_nodes": self.max_nodes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class ResponseCache:
+    """Encoded response bodies, keyed by a hash of the request.
+
+    Each entry can also hold compressed copies of its body, one per
+    content encoding, so repeat hits are not compressed again. Bounded by
+    the total size of the bodies and their copies and by their age. The
+    least recently used entries are dropped first.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, max_age=300.0):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (body, created, {encoding: body})
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def check_version(self, version):
+        """Drop every entry if the rules version changed."""
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self._bytes = 0
+                self.version = version
+
+    def get(self, key):
+        """Return the cached body, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] > self.max_age:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, body):
+        """Store an encoded body, evicting old ones to stay under max_bytes."""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (body, time.monotonic(), {})
+            self._bytes += len(body)
+            self._evict()
+
+    def get_encoded(self, key, encoding):
+        """Return the body under `key` compressed with `encoding`, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return entry[2].get(encoding)
+
+    def put_encoded(self, key, encoding, body):
+        """Keep a compressed copy of the body under `key`, if still cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or encoding in entry[2]:
+                return
+            entry[2][encoding] = body
+            self._bytes += len(body)
+            self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, key):
+        body, _, encoded = self._entries.pop(key)
+        self._bytes -= len(body) + sum(len(b) for b in encoded.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_age": self.max_age,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
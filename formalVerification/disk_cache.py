@@ -0,0 +1,172 @@
+"""
+Persistent cache for the verification backend.
+
+Keeps encoded responses and compiled transition tables in a SQLite file so
+a restarted server can answer repeat requests without recomputing them.
+Every row is tagged with the SHA-256 of the rules.pl it was computed
+under; compact() drops rows for other rules and trims the file to its size
+limit, least recently used rows first. The whole file is also tagged with
+the code's format version and emptied when it is opened by another one.
+
+Tables are stored pickled, so the cache file must only be writable by the
+server itself.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    rules TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_used ON responses (used);
+CREATE TABLE IF NOT EXISTS tables (
+    rules TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class DiskCache:
+    """SQLite-backed store of response bodies and transition tables."""
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, version=0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = str(version)
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = None
+        self.reopen()
+
+    def reopen(self):
+        """Open a fresh connection, e.g. in a newly forked process.
+
+        SQLite connections must not be shared across fork().
+        """
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+            row = self._db.execute(
+                "SELECT value FROM meta WHERE name = 'version'").fetchone()
+            if row is None or row[0] != self.version:
+                # Written by other code: tables and bodies may not match ours
+                self._db.execute("DELETE FROM responses")
+                self._db.execute("DELETE FROM tables")
+                self._db.execute(
+                    "INSERT OR REPLACE INTO meta (name, value) VALUES ('version', ?)",
+                    (self.version,))
+            self._db.commit()
+            self._bytes = self._total_bytes()
+
+    def _total_bytes(self):
+        row = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return row[0]
+
+    def get_response(self, key):
+        """Return a cached response body, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE responses SET used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            self.hits += 1
+            return bytes(row[0])
+
+    def put_response(self, key, rules_version, body):
+        """Store a response body computed under the given rules."""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._db.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if old is not None:
+                self._bytes -= old[0]
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, rules, body, size, used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, rules_version, body, len(body), time.time()))
+            self._db.commit()
+            self._bytes += len(body)
+            if self._bytes > self.max_bytes:
+                self._trim()
+
+    def get_table(self, rules_version):
+        """Return the transition table compiled from these rules, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM tables WHERE rules = ?", (rules_version,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE tables SET used = ? WHERE rules = ?", (time.time(), rules_version))
+            self._db.commit()
+        return pickle.loads(row[0])
+
+    def put_table(self, table):
+        """Store a compiled transition table under its rules_version."""
+        data = pickle.dumps(table, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO tables (rules, data, used) VALUES (?, ?, ?)",
+                (table.rules_version, data, time.time()))
+            self._db.commit()
+
+    def compact(self, rules_version):
+        """Drop rows computed under other rules and trim to max_bytes."""
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE rules != ?", (rules_version,))
+            self._db.execute("DELETE FROM tables WHERE rules != ?", (rules_version,))
+            self._db.commit()
+            self._bytes = self._total_bytes()
+            self._trim()
+            self._db.execute("VACUUM")
+
+    def _trim(self):
+        """Delete least recently used responses down to 90% of max_bytes.
+
+        Must be called with _lock held.
+        """
+        target = self.max_bytes * 9 // 10
+        if self._bytes <= target:
+            return
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY used").fetchall()
+        doomed = []
+        for key, size in rows:
+            if self._bytes <= target:
+                break
+            doomed.append((key,))
+            self._bytes -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {
+                "path": self.path,
+                "size": count,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
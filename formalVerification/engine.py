@@ -0,0 +1,283 @@
+"""
+Compiled transition table for the verification backend.
+
+Reads action/1, precondition/2 and apply_action/3 out of rules.pl once and
+keeps them as plain Python data, so verifying a sequence does not need a
+Prolog round-trip per step.
+"""
+import hashlib
+from collections import deque
+
+# Upper bound on precomputed worlds; steps from any other world are
+# computed from the rules directly
+MAX_STATES = 1 << 16
+
+
+class PrologQueryError(RuntimeError):
+    """verify_sequence/3 failed instead of returning a trace."""
+
+
+def rules_digest(path):
+    """Return the SHA-256 hex digest of a rules file."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def decode_atom(value):
+    """Convert a pyswip atom/bytes value to a Python string."""
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return str(value)
+
+
+def query_atoms(prolog, query, var):
+    """Run a query and return the decoded bindings of one variable."""
+    return [decode_atom(item[var]) for item in prolog.query(query)]
+
+
+def quote_atom(name):
+    """Quote a string as a Prolog atom."""
+    escaped = name.replace("\\", "\\\\").replace("'", "\\'")
+    return f"'{escaped}'"
+
+
+class TransitionTable:
+    """In-memory copy of the action rules.
+
+    Conditions are interned to bit positions and a world is an int with one
+    bit set per condition that holds. Worlds only turn back into sorted
+    condition lists (see state_list()) when a response is built.
+
+    explore() precomputes every world reachable from the initial one, after
+    which a step is a lookup in a dense (world, action) table.
+    """
+
+    def __init__(self, actions, preconditions, effects, initial_world,
+                 rules_version=None):
+        self.actions = list(actions)
+        self.preconditions = preconditions  # action -> [cond, ...]
+        self.effects = effects  # action -> (added, deleted)
+
+        self.conditions = []  # bit position -> condition
+        self.bits = {}  # condition -> bit mask
+        universe = set(initial_world)
+        for action_atom in self.actions:
+            universe.update(preconditions[action_atom])
+            universe.update(effects[action_atom][0])
+            universe.update(effects[action_atom][1])
+        for cond in sorted(universe):
+            self.intern(cond)
+
+        # action -> (precondition mask, [(cond, bit), ...], add mask, keep mask)
+        self._rules = {}
+        for action_atom in self.actions:
+            added, deleted = effects[action_atom]
+            pre_bits = [(c, self.bits[c]) for c in preconditions[action_atom]]
+            self._rules[action_atom] = (
+                self.encode(preconditions[action_atom]),
+                pre_bits,
+                self.encode(added),
+                ~self.encode(deleted),
+            )
+
+        self.initial_world = self.encode(initial_world)
+        self.rules_version = rules_version
+        self._state_lists = {}
+
+        self.states = []  # reachable worlds, in BFS order
+        self._state_index = {}  # world -> row in _dense
+        self._action_index = {a: i for i, a in enumerate(self.actions)}
+        self._dense = []  # row per world, (result, missing, next world) per action
+
+    def is_action(self, action_atom):
+        return action_atom in self._rules
+
+    def intern(self, cond):
+        """Return the bit for a condition, assigning a new one if needed."""
+        bit = self.bits.get(cond)
+        if bit is None:
+            bit = 1 << len(self.conditions)
+            self.conditions.append(cond)
+            self.bits[cond] = bit
+        return bit
+
+    def encode(self, conds):
+        """Turn an iterable of condition names into a world mask."""
+        mask = 0
+        for cond in conds:
+            mask |= self.intern(cond)
+        return mask
+
+    def state_list(self, mask):
+        """Return the sorted condition names of a world mask."""
+        names = self._state_lists.get(mask)
+        if names is None:
+            names = sorted(c for c, bit in self.bits.items() if mask & bit)
+            self._state_lists[mask] = names
+        return names
+
+    def explore(self, max_states=MAX_STATES):
+        """Breadth-first search the worlds reachable from the initial one.
+
+        Fills the dense transition table used by step(). Stops adding worlds
+        once max_states have been found.
+        """
+        self.states = []
+        self._state_index = {}
+        self._dense = []
+        queue = deque([self.initial_world])
+        self._state_index[self.initial_world] = 0
+        self.states.append(self.initial_world)
+        while queue:
+            world = queue.popleft()
+            row = []
+            for action_atom in self.actions:
+                result, _, missing, new_world = self._compute(world, action_atom)
+                row.append((result, missing, new_world))
+                if new_world not in self._state_index and len(self.states) < max_states:
+                    self._state_index[new_world] = len(self.states)
+                    self.states.append(new_world)
+                    queue.append(new_world)
+            self._dense.append(row)
+        return len(self.states)
+
+    def step(self, world, action_atom):
+        """Apply one action to a world mask.
+
+        Returns (result, preconditions, missing, new_world), the same values
+        verify_sequence/2 reports for the step.
+        """
+        a = self._action_index.get(action_atom)
+        if a is None:
+            return "invalid_action", [], [], world
+        i = self._state_index.get(world)
+        if i is not None:
+            result, missing, new_world = self._dense[i][a]
+            return result, self.preconditions[action_atom], missing, new_world
+        return self._compute(world, action_atom)
+
+    def _compute(self, world, action_atom):
+        """Apply one action by evaluating the compiled rules."""
+        rule = self._rules.get(action_atom)
+        if rule is None:
+            return "invalid_action", [], [], world
+
+        pre_mask, pre_bits, add_mask, keep_mask = rule
+        if world & pre_mask != pre_mask:
+            result = "precondition_failed"
+            new_world = world
+        else:
+            result = "valid"
+            new_world = (world & keep_mask) | add_mask
+
+        # verify_sequence/2 checks missing preconditions after the action
+        # has been applied, so they are checked against the new world.
+        if new_world & pre_mask == pre_mask:
+            missing = []
+        else:
+            missing = [c for c, bit in pre_bits if not new_world & bit]
+        return result, self.preconditions[action_atom], missing, new_world
+
+
+def world_term(world):
+    """Format a world as a Prolog ordered-set list."""
+    return "[" + ", ".join(quote_atom(c) for c in sorted(world)) + "]"
+
+
+def _probe_effects(prolog, action_atom, world):
+    """Run apply_action/3 on a given world and return the world after it."""
+    query = f"apply_action({quote_atom(action_atom)}, {world_term(world)}, S)"
+    res = list(prolog.query(query))
+    return [decode_atom(c) for c in res[0]["S"]]
+
+
+def compile_transition_table(prolog, rules_version=None):
+    """Build a TransitionTable from the rules loaded in `prolog`.
+
+    Effects of apply_action/3 are found by probing: applying an action to an
+    empty world gives the conditions it adds, applying it to a world holding
+    every known condition gives the ones it removes. The reachable state
+    space is explored before the table is returned.
+    """
+    actions = query_atoms(prolog, "action(A)", "A")
+
+    preconditions = {}
+    for action_atom in actions:
+        preconditions[action_atom] = query_atoms(
+            prolog, f"precondition({quote_atom(action_atom)}, C)", "C")
+
+    res = list(prolog.query("initial_world(W)"))
+    initial_world = [decode_atom(c) for c in res[0]["W"]]
+
+    added = {a: frozenset(_probe_effects(prolog, a, [])) for a in actions}
+
+    universe = set(initial_world)
+    for conds in preconditions.values():
+        universe.update(conds)
+    for conds in added.values():
+        universe.update(conds)
+
+    effects = {}
+    for action_atom in actions:
+        remaining = set(_probe_effects(prolog, action_atom, universe))
+        deleted = frozenset(c for c in universe if c not in remaining)
+        effects[action_atom] = (added[action_atom], deleted)
+
+    table = TransitionTable(actions, preconditions, effects, initial_world,
+                            rules_version=rules_version)
+    table.explore()
+    return table
+
+
+def prolog_trace(prolog, action_atoms, world=None):
+    """Verify a whole sequence with one verify_sequence/3 query.
+
+    Starts from `world` (condition names) if given, otherwise from
+    initial_world/1. Returns (initial_world, trace) where each trace entry
+    is (action, result, preconditions, missing, world). Raises
+    PrologQueryError, naming the action it fails on, if the query fails.
+    """
+    result = _query_trace(prolog, action_atoms, world)
+    if result is None:
+        raise PrologQueryError(_failure_message(prolog, action_atoms, world))
+    return result
+
+
+def _query_trace(prolog, action_atoms, world):
+    """Run verify_sequence/3 and decode its trace, or None if it fails."""
+    action_list = ", ".join(quote_atom(a) for a in action_atoms)
+    if world is None:
+        start = "initial_world(World0)"
+    else:
+        start = f"World0 = {world_term(world)}"
+    query = (
+        f"{start}, "
+        f"verify_sequence(World0, [{action_list}], Trace)"
+    )
+    res = list(prolog.query(query))
+    if not res:
+        return None
+    initial = tuple(decode_atom(s) for s in res[0]["World0"])
+    trace = [
+        (action_atom,
+         decode_atom(result),
+         [decode_atom(c) for c in preconditions],
+         [decode_atom(c) for c in missing],
+         tuple(decode_atom(s) for s in world))
+        for action_atom, (_, result, preconditions, missing, world)
+        in zip(action_atoms, res[0]["Trace"])
+    ]
+    return initial, trace
+
+
+def _failure_message(prolog, action_atoms, world):
+    """Find the step a failed verify_sequence/3 query stopped at.
+
+    Only runs after a failure, one query per step up to the failing one.
+    """
+    for step, action_atom in enumerate(action_atoms, 1):
+        result = _query_trace(prolog, [action_atom], world)
+        if result is None:
+            return f"verify_sequence/3 failed at step {step}, action '{action_atom}'"
+        world = result[1][0][4]
+    return "verify_sequence/3 failed on the whole sequence"
@@ -0,0 +1,82 @@
+"""
+JSON encoding and compression for large responses.
+
+FastJSONProvider makes jsonify() use orjson when it is installed (pip
+install orjson) and Flask's json module otherwise. compress_response()
+gzip- or deflate-encodes a response body when the client accepts it.
+"""
+import gzip
+import zlib
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the json module
+    orjson = None
+
+# Encodings we can produce, in order of preference
+ENCODINGS = ("gzip", "deflate")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson when available.
+
+    Output matches the default provider's compact form (sorted keys, no
+    whitespace), except that non-ASCII text is written as UTF-8 instead of
+    being escaped. Debug mode and extra dumps() arguments fall back to the
+    default provider.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode("utf-8")
+
+    def response(self, *args, **kwargs):
+        if orjson is None or self._app.debug or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def choose_encoding(accept_encoding):
+    """Pick the best encoding allowed by an Accept-Encoding header, or None."""
+    for encoding in ENCODINGS:
+        if accept_encoding[encoding] > 0:
+            return encoding
+    return None
+
+
+def compress_body(body, encoding, level=6):
+    """Encode body bytes with "gzip" or "deflate"."""
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=level)
+    return zlib.compress(body, level)
+
+
+def compress_response(response, accept_encoding, min_size=1024, level=6):
+    """Compress a response body in place if it is big enough and allowed.
+
+    Streamed, already-encoded and non-200 responses are left alone. ETags
+    are made weak since the encoded body differs byte for byte.
+    """
+    if (response.status_code != 200 or response.is_streamed
+            or response.direct_passthrough or "Content-Encoding" in response.headers):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+
+    response.set_data(compress_body(body, encoding, level))
+    response.headers["Content-Encoding"] = encoding
+
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,99 @@
+"""
+Pool of Prolog engines for the verification backend.
+
+pyswip embeds one SWI-Prolog runtime per process, so every engine lives in
+its own worker process with rules.pl consulted once when the worker starts.
+A request hands its whole sequence to one worker and gets the decoded
+trace back, so requests never share an engine.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import compile_transition_table, prolog_trace, rules_digest
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.pl")
+
+# Engine owned by the current worker process, and the rules it loaded
+_prolog = None
+_rules_version = None
+
+
+def _init_worker(rules_path):
+    """Start a worker's engine and load the rules into it."""
+    global _prolog, _rules_version
+    from pyswip import Prolog
+    _rules_version = rules_digest(rules_path)
+    _prolog = Prolog()
+    _prolog.consult(rules_path)
+
+
+def _worker_trace(action_atoms, world=None):
+    return prolog_trace(_prolog, action_atoms, world)
+
+
+def _worker_compile():
+    return compile_transition_table(_prolog, rules_version=_rules_version)
+
+
+class PrologPool:
+    """Fixed-size pool of pre-consulted Prolog worker processes."""
+
+    def __init__(self, size=None, rules_path=RULES_PATH):
+        self.size = max(1, size or os.cpu_count() or 1)
+        self.rules_path = rules_path
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.size,
+            initializer=_init_worker,
+            initargs=(rules_path,),
+        )
+        self._users = 0
+        self._retired = False
+        self._lock = threading.Lock()
+
+    def trace(self, action_atoms, world=None):
+        """Verify a sequence on one of the engines, see prolog_trace()."""
+        return self._executor.submit(_worker_trace, list(action_atoms), world).result()
+
+    def trace_many(self, sequences, worlds=None):
+        """Verify several sequences across all engines, in order."""
+        sequences = [list(s) for s in sequences]
+        if worlds is None:
+            worlds = [None] * len(sequences)
+        return list(self._executor.map(_worker_trace, sequences, worlds))
+
+    def compile_table(self):
+        """Compile the transition table on one of the engines."""
+        return self._executor.submit(_worker_compile).result()
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def acquire(self):
+        """Hold the pool open for a caller that queries it later.
+
+        Returns False if the pool was already retired. Pair with release().
+        """
+        with self._lock:
+            if self._retired:
+                return False
+            self._users += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._users -= 1
+            done = self._retired and self._users == 0
+        if done:
+            self._executor.shutdown(wait=False)
+
+    def retire(self):
+        """Shut the pool down once every holder has released it.
+
+        Queries already submitted finish on the old engines either way.
+        """
+        with self._lock:
+            self._retired = True
+            done = self._users == 0
+        if done:
+            self._executor.shutdown(wait=False)
@@ -1,3 +1,4 @@
+:- use_module(library(ordsets)).
 :- dynamic world/1.
 
 % ---------------------------------
@@ -58,64 +59,122 @@ precondition(stop, powered_on).
 
 % ---------------------------------
 % INITIAL WORLD STATE
+% A world is an ordered set (library(ordsets)) of conditions
 % ---------------------------------
-world(powered_off).
-world(battery_full).
-world(object_detected).
+initial_world([battery_full, object_detected, powered_off]).
 
 
 % ---------------------------------
 % STATE TRANSITIONS
-% These modify world depending on executed action
+% apply_action(Action, State0, State)
+% Pure: the world is passed in and out, nothing is asserted
 % ---------------------------------
 
-apply_action(poweron) :-
-    retractall(world(powered_off)),
-    assertz(world(powered_on)).
+apply_action(poweron, S0, S) :- !,
+    ord_del_element(S0, powered_off, S1),
+    ord_add_element(S1, powered_on, S).
 
-apply_action(poweroff) :-
-    retractall(world(powered_on)),
-    assertz(world(powered_off)).
+apply_action(poweroff, S0, S) :- !,
+    ord_del_element(S0, powered_on, S1),
+    ord_add_element(S1, powered_off, S).
 
-apply_action(scanarea) :-
-    assertz(world(scanned)).
+apply_action(scanarea, S0, S) :- !,
+    ord_add_element(S0, scanned, S).
 
-apply_action(moveforward) :-
-    retractall(world(battery_full)),
-    assertz(world(battery_low)).
+apply_action(moveforward, S0, S) :- !,
+    ord_del_element(S0, battery_full, S1),
+    ord_add_element(S1, battery_low, S).
 
-apply_action(moveleft) :-
-    retractall(world(battery_full)),
-    assertz(world(battery_low)).
+apply_action(moveleft, S0, S) :- !,
+    ord_del_element(S0, battery_full, S1),
+    ord_add_element(S1, battery_low, S).
 
-apply_action(moveright) :-
-    retractall(world(battery_full)),
-    assertz(world(battery_low)).
+apply_action(moveright, S0, S) :- !,
+    ord_del_element(S0, battery_full, S1),
+    ord_add_element(S1, battery_low, S).
 
-apply_action(pickobject) :-
-    retractall(world(object_detected)),
-    assertz(world(holding_object)).
+apply_action(pickobject, S0, S) :- !,
+    ord_del_element(S0, object_detected, S1),
+    ord_add_element(S1, holding_object, S).
 
-apply_action(releaseobject) :-
-    retractall(world(holding_object)).
+apply_action(releaseobject, S0, S) :- !,
+    ord_del_element(S0, holding_object, S).
 
-apply_action(_) :- true. % default: no state change
+apply_action(_, S, S). % default: no state change
 
 
 % ---------------------------------
-% VALIDATION ENTRY POINT
-% validate(Action, Result)
-% Also applies changes if action is valid
+% TRANSITION ENTRY POINT
+% step(State0, Action, Result, State)
+% State is State0 with the action applied if it is valid
 % ---------------------------------
 
-validate(Action, "invalid_action") :-
+step(State0, Action, "invalid_action", State0) :-
     \+ action(Action), !.
 
-validate(Action, "precondition_failed") :-
+step(State0, Action, "precondition_failed", State0) :-
     precondition(Action, Cond),
-    \+ world(Cond), !.
+    \+ ord_memberchk(Cond, State0), !.
 
-validate(Action, "valid") :-
+step(State0, Action, "valid", State) :-
     action(Action),
-    forall(precondition(Action, Cond), world(Cond)), 
-    apply_action(Action), !.
+    forall(precondition(Action, Cond), ord_memberchk(Cond, State0)),
+    apply_action(Action, State0, State).
+
+% missing_preconditions(State, Action, Missing)
+missing_preconditions(State, Action, Missing) :-
+    findall(Cond,
+            ( precondition(Action, Cond), \+ ord_memberchk(Cond, State) ),
+            Missing).
+
+
+% ---------------------------------
+% WHOLE-SEQUENCE VERIFICATION
+% verify_sequence(Actions, Trace)
+% verify_sequence(State0, Actions, Trace)
+% Validates every action in order, threading the world through.
+% Each Trace entry is [Action, Result, Preconditions, Missing, World]
+% where World is the world after the step.
+% ---------------------------------
+
+verify_sequence(Actions, Trace) :-
+    initial_world(State0),
+    verify_sequence(State0, Actions, Trace).
+
+verify_sequence(_, [], []).
+verify_sequence(State0, [Action|Actions], [Entry|Trace]) :-
+    verify_step(State0, Action, Entry, State),
+    verify_sequence(State, Actions, Trace).
+
+verify_step(State0, Action, [Action, Result, Preconds, Missing, State], State) :-
+    findall(Cond, precondition(Action, Cond), Preconds),
+    catch(step(State0, Action, Result, State),
+          _, ( Result = "error_processing", State = State0 )),
+    % Missing preconditions are checked after the action has been applied
+    missing_preconditions(State, Action, Missing).
+
+
+% ---------------------------------
+% DATABASE WRAPPERS
+% For interactive use: world/1 holds the current world and
+% validate/2 steps it in place
+% ---------------------------------
+
+current_world(State) :-
+    findall(Cond, world(Cond), Conds),
+    list_to_ord_set(Conds, State).
+
+set_world(State) :-
+    retractall(world(_)),
+    forall(member(Cond, State), assertz(world(Cond))).
+
+reset_world :-
+    initial_world(State),
+    set_world(State).
+
+validate(Action, Result) :-
+    current_world(State0),
+    step(State0, Action, Result, State),
+    set_world(State).
+
+:- initialization(reset_world).
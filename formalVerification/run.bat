@@ -3,7 +3,10 @@ cd /d "%~dp0"
 echo Starting Formal Verification Engine...
 echo.
 echo Starting Flask backend server...
-start "Flask Backend" cmd /k "cd /d %~dp0 && python app.py"
+rem "run.bat production" serves the backend with serve.py (waitress)
+set BACKEND=app.py
+if /i "%~1"=="production" set BACKEND=serve.py
+start "Flask Backend" cmd /k "cd /d %~dp0 && python %BACKEND%"
 timeout /t 5 /nobreak >nul
 echo.
 echo Starting Tkinter frontend...
@@ -1,19 +1,26 @@
 """
 Helper script to run both backend and frontend simultaneously.
+
+Pass --production to start the backend with serve.py (multi-worker
+server) instead of Flask's development server.
 """
 import subprocess
 import sys
 import time
 import os
 
-def run_apps():
-    """Start both Flask backend and Tkinter frontend."""
+def run_apps(production=False):
+    """Start both Flask backend and Tkinter frontend.
+    
+    Args:
+        production: Serve the backend with serve.py instead of app.py
+    """
     print("Starting Formal Verification Engine...")
     print("\nStarting Flask backend server...")
     
     # Start Flask backend in a separate process
     backend = subprocess.Popen(
-        [sys.executable, "app.py"],
+        [sys.executable, "serve.py" if production else "app.py"],
         cwd=os.path.dirname(os.path.abspath(__file__))
     )
     
@@ -44,5 +51,5 @@ def run_apps():
         print("Backend server stopped.")
 
 if __name__ == "__main__":
-    run_apps()
+    run_apps(production="--production" in sys.argv[1:])
 
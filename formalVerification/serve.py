@@ -0,0 +1,119 @@
+"""
+Production server for the verification backend.
+
+Runs app.py under gunicorn with several worker processes. The rules are
+loaded and the transition table compiled once in the master process
+before the workers fork, so every worker shares the table copy-on-write
+instead of compiling its own. On Windows, where gunicorn does not run,
+the app is served by waitress with a thread pool instead.
+
+    pip install gunicorn     (Linux / macOS)
+    pip install waitress     (Windows)
+
+Usage:
+    python serve.py --workers 4 --port 5000
+
+Every option can also be set through the environment (FV_HOST, FV_PORT,
+FV_WORKERS, FV_THREADS, FV_KEEPALIVE, FV_TIMEOUT, FV_GRACEFUL_TIMEOUT,
+FV_MAX_REQUESTS). Send the gunicorn master SIGHUP to restart the workers
+gracefully; --max-requests recycles each worker after that many requests.
+"""
+import argparse
+import logging
+import os
+import sys
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, str(default)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the verification server.")
+    parser.add_argument("--host", default=os.environ.get("FV_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=env_int("FV_PORT", 5000))
+    parser.add_argument("--workers", type=int, default=env_int("FV_WORKERS", os.cpu_count() or 1),
+                        help="Worker processes (gunicorn)")
+    parser.add_argument("--threads", type=int, default=env_int("FV_THREADS", 4),
+                        help="Threads per worker process")
+    parser.add_argument("--keepalive", type=int, default=env_int("FV_KEEPALIVE", 5),
+                        help="Seconds to keep idle connections open")
+    parser.add_argument("--timeout", type=int, default=env_int("FV_TIMEOUT", 120),
+                        help="Seconds before a silent worker is restarted")
+    parser.add_argument("--graceful-timeout", type=int, default=env_int("FV_GRACEFUL_TIMEOUT", 30),
+                        help="Seconds workers get to finish requests on restart")
+    parser.add_argument("--max-requests", type=int, default=env_int("FV_MAX_REQUESTS", 0),
+                        help="Restart a worker after this many requests (0 = never)")
+    return parser.parse_args(argv)
+
+
+def preload():
+    """Import the app and compile the rules before any worker is forked."""
+    import app
+    app.verifier.engines()
+    # Prolog workers do not survive fork(); each server worker starts its
+    # own on first use and keeps the compiled table.
+    app.verifier.release_pool()
+    return app
+
+
+def post_fork(server, worker):
+    """gunicorn hook: reset per-process resources in a new worker."""
+    import app
+    if app.disk_cache is not None:
+        app.disk_cache.reopen()
+
+
+def run_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+    options = {
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        "threads": args.threads,
+        "worker_class": "gthread",
+        "keepalive": args.keepalive,
+        "timeout": args.timeout,
+        "graceful_timeout": args.graceful_timeout,
+        "max_requests": args.max_requests,
+        # Spread restarts out so workers do not all recycle at once
+        "max_requests_jitter": args.max_requests // 10,
+        "preload_app": True,
+        "post_fork": post_fork,
+    }
+    Server(preload().app, options).run()
+
+
+def run_waitress(args):
+    from waitress import serve
+    app = preload().app
+    print(f"Serving on http://{args.host}:{args.port} with waitress "
+          f"({args.threads} threads)")
+    serve(app, host=args.host, port=args.port, threads=args.threads,
+          channel_timeout=args.timeout)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if sys.platform == "win32":
+        run_waitress(args)
+    else:
+        run_gunicorn(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import json
+import os
+import sys
+
+import pytest
+
+# The backend modules are imported flat, the way app.py imports them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# rules.pl written out by hand, so the HTTP tests run without SWI-Prolog
+ACTIONS = ["poweron", "poweroff", "scanarea", "moveforward", "moveleft", "moveright",
+           "turnleft", "turnright", "pickobject", "releaseobject", "checkbattery", "stop"]
+PRECONDITIONS = {
+    "poweron": ["powered_off"],
+    "poweroff": ["powered_on"],
+    "scanarea": ["powered_on"],
+    "moveforward": ["powered_on", "scanned"],
+    "moveleft": ["powered_on", "scanned"],
+    "moveright": ["powered_on", "scanned"],
+    "turnleft": ["powered_on", "scanned"],
+    "turnright": ["powered_on", "scanned"],
+    "pickobject": ["powered_on", "scanned", "object_detected"],
+    "releaseobject": ["powered_on", "holding_object"],
+    "checkbattery": ["powered_on"],
+    "stop": ["powered_on"],
+}
+EFFECTS = {  # action -> (added, deleted)
+    "poweron": ({"powered_on"}, {"powered_off"}),
+    "poweroff": ({"powered_off"}, {"powered_on"}),
+    "scanarea": ({"scanned"}, set()),
+    "moveforward": ({"battery_low"}, {"battery_full"}),
+    "moveleft": ({"battery_low"}, {"battery_full"}),
+    "moveright": ({"battery_low"}, {"battery_full"}),
+    "pickobject": ({"holding_object"}, {"object_detected"}),
+    "releaseobject": (set(), {"holding_object"}),
+}
+INITIAL_WORLD = ["battery_full", "object_detected", "powered_off"]
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_baseline():
+    """Responses of the original per-step Prolog server, see test_app.py.
+
+    That server kept the world as asserted facts, so its final_state could
+    repeat or reorder conditions; worlds are ordered sets now and the rest
+    of the body is unchanged.
+    """
+    cases = load_fixture("baseline.json")
+    for case in cases:
+        if "final_state" in case["response"]:
+            case["response"]["final_state"] = sorted(set(case["response"]["final_state"]))
+    return cases
+
+
+def make_table(rules_version="test-rules"):
+    """A TransitionTable for rules.pl, built without Prolog."""
+    from engine import TransitionTable
+    effects = {a: tuple(map(frozenset, EFFECTS.get(a, ((), ())))) for a in ACTIONS}
+    table = TransitionTable(ACTIONS, PRECONDITIONS, effects, INITIAL_WORLD,
+                            rules_version=rules_version)
+    table.explore()
+    return table
+
+
+class TablePool:
+    """Stands in for PrologPool, answering queries from a TransitionTable.
+
+    Records every sequence sent to it in `sent`.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.sent = []
+        self.users = 0
+
+    def acquire(self):
+        self.users += 1
+        return True
+
+    def release(self):
+        self.users -= 1
+
+    def trace_many(self, sequences, worlds):
+        from verifier import table_trace
+        results = []
+        for actions, names in zip(sequences, worlds):
+            self.sent.append(list(actions))
+            trace = [(a, result, pre, missing, tuple(self.table.state_list(world)))
+                     for a, result, pre, missing, world
+                     in table_trace(self.table, actions, self.table.encode(names))]
+            results.append((tuple(names), trace))
+        return results
+
+
+@pytest.fixture
+def table():
+    return make_table()
+
+
+@pytest.fixture
+def backend(monkeypatch, table):
+    """app.py serving `table`, with fresh caches and no Prolog or disk cache."""
+    import app
+    from caches import PrefixTrie, ResponseCache, TransitionMemo
+    monkeypatch.setattr(app.verifier, "engines", lambda: (None, table))
+    monkeypatch.setattr(app.verifier, "engine", "table")
+    monkeypatch.setattr(app.verifier, "prefix_trie", PrefixTrie())
+    monkeypatch.setattr(app.verifier, "transition_memo", TransitionMemo())
+    monkeypatch.setattr(app, "response_cache", ResponseCache())
+    monkeypatch.setattr(app, "disk_cache", None)
+    monkeypatch.setattr(app, "ENGINE_MODE", "table")
+    return app
+
+
+@pytest.fixture
+def client(backend):
+    return backend.app.test_client()
+
+
+@pytest.fixture(scope="session")
+def verifier():
+    """A Verifier on the real rules.pl, skipped without SWI-Prolog."""
+    try:
+        import pyswip  # noqa: F401  also fails if SWI-Prolog is missing
+    except Exception as e:
+        pytest.skip(f"pyswip unavailable: {e}")
+    from verifier import Verifier
+    with Verifier(workers=1) as verifier:
+        verifier.engines()
+        yield verifier
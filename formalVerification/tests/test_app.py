@@ -0,0 +1,38 @@
+import pytest
+
+from conftest import load_baseline
+
+BASELINE = load_baseline()
+
+
+@pytest.mark.parametrize("case", BASELINE, ids=lambda c: f"{c['endpoint']} {c['request']['actions']}")
+def test_matches_baseline(client, case):
+    response = client.post(case["endpoint"], json=case["request"])
+    assert response.status_code == case["status"]
+    assert response.get_json() == case["response"]
+
+
+def test_repeat_is_served_from_cache(client, backend):
+    case = BASELINE[0]
+    first = client.post(case["endpoint"], json=case["request"])
+    second = client.post(case["endpoint"], json=case["request"])
+    assert second.get_json() == case["response"]
+    assert second.get_etag() == first.get_etag()
+    assert backend.response_cache.stats()["hits"] == 1
+
+
+def test_non_object_body_is_rejected(client):
+    for endpoint in ("/verify", "/fsm"):
+        response = client.post(endpoint, json=[1, 2])
+        assert response.status_code == 400
+        assert response.get_json() == {"error": "Request body must be a JSON object"}
+
+
+def test_format_change_changes_etag(client, backend, monkeypatch):
+    case = BASELINE[0]
+    etag = client.post(case["endpoint"], json=case["request"]).get_etag()[0]
+    monkeypatch.setattr(backend, "FORMAT_VERSION", backend.FORMAT_VERSION + 1)
+    response = client.post(case["endpoint"], json=case["request"],
+                           headers={"If-None-Match": f'"{etag}"'})
+    assert response.status_code == 200
+    assert response.get_etag()[0] != etag
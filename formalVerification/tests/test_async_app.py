@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+import pytest
+
+from conftest import load_baseline
+
+httpx = pytest.importorskip("httpx")
+async_app = pytest.importorskip("async_app")
+
+BASELINE = load_baseline()[0]
+
+
+def post_all(requests):
+    """POST (path, json body or raw bytes, headers) tuples to async_app in order."""
+    async def run():
+        transport = httpx.ASGITransport(app=async_app.application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = []
+            for path, body, headers in requests:
+                if isinstance(body, bytes):
+                    responses.append(await client.post(path, content=body, headers=headers))
+                else:
+                    responses.append(await client.post(path, json=body, headers=headers))
+            return responses
+    return asyncio.run(run())
+
+
+@pytest.fixture(autouse=True)
+def fresh_plans(backend, monkeypatch):
+    monkeypatch.setattr(async_app, "planned", async_app.OrderedDict())
+
+
+def test_verify_matches_flask(client):
+    expected = client.post("/verify", json=BASELINE["request"]).get_json()
+    response, = post_all([("/verify", BASELINE["request"], {})])
+    assert response.status_code == 200
+    assert response.json() == expected
+
+
+def test_planning_runs_off_the_loop(backend, monkeypatch):
+    threads = []
+    plan = backend.verify_job
+
+    def verify_job(data):
+        threads.append(threading.current_thread())
+        return plan(data)
+
+    monkeypatch.setattr(backend, "verify_job", verify_job)
+    post_all([("/verify", BASELINE["request"], {})])
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_repeats_are_answered_on_the_loop(monkeypatch):
+    first, = post_all([("/verify", BASELINE["request"], {})])
+    etag = first.headers["etag"]
+
+    async def no_executor(*args, **kwargs):
+        raise AssertionError("repeat request went to the executor")
+
+    monkeypatch.setattr(async_app, "run_job", no_executor)
+    not_modified, cached = post_all([
+        ("/verify", BASELINE["request"], {"If-None-Match": etag}),
+        ("/verify", BASELINE["request"], {}),
+    ])
+    assert not_modified.status_code == 304
+    assert cached.status_code == 200
+    assert cached.content == first.content
+
+
+def test_new_rules_replan(backend):
+    first, = post_all([("/verify", BASELINE["request"], {})])
+    backend.response_cache.check_version("other-rules")
+    again, = post_all([("/verify", BASELINE["request"], {"If-None-Match": first.headers["etag"]})])
+    # Planned again on the executor, under the table's own rules version
+    assert again.status_code == 304
+    assert backend.response_cache.version == "test-rules"
+
+
+def test_bad_bodies_are_rejected():
+    not_json, not_object = post_all([
+        ("/verify", b"{not json", {"Content-Type": "application/json"}),
+        ("/fsm", [1, 2], {}),
+    ])
+    assert not_json.status_code == 400
+    assert not_json.json() == {"error": "Request body must be JSON"}
+    assert not_object.status_code == 400
+    assert not_object.json() == {"error": "Request body must be a JSON object"}
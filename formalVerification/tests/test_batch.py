@@ -0,0 +1,65 @@
+from conftest import TablePool
+
+VALID = ["poweron", "scanarea", "pickobject", "releaseobject", "poweroff"]
+INVALID = ["scanarea", "poweron", "fly", "scanarea"]
+
+
+def batch(client, **payload):
+    return client.post("/verify/batch", json=payload)
+
+
+def test_verdicts_and_counts(client):
+    response = batch(client, sequences=[
+        {"actions": VALID}, {"actions": INVALID}, {"actions": VALID}])
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [r["valid"] for r in body["results"]] == [True, False, True]
+    assert body["results"][1] == {"valid": False, "steps": 4, "invalid_count": 2,
+                                  "first_invalid": 0}
+    assert body["count"] == 3
+    assert body["valid_count"] == 2
+    assert body["unique_count"] == 2
+
+
+def test_trace_output_matches_verify(client):
+    expected = client.post("/verify", json={"actions": INVALID}).get_json()
+    body = batch(client, sequences=[{"actions": INVALID}], output="trace").get_json()
+    assert body["results"] == [expected]
+
+
+def test_fail_fast_stops_at_first_invalid(client):
+    body = batch(client, sequences=[{"actions": INVALID}], fail_fast=True).get_json()
+    assert body["results"] == [{"valid": False, "steps": 1, "invalid_count": 1,
+                                "first_invalid": 0}]
+
+
+def test_fail_fast_stops_querying_prolog(client, backend, table, monkeypatch):
+    from caches import TransitionMemo
+    from verifier import FAIL_FAST_CHUNK
+    pool = TablePool(table)
+    monkeypatch.setattr(backend.verifier, "engines", lambda: (pool, table))
+    # Without the memo every step is sent to the pool
+    monkeypatch.setattr(backend.verifier, "transition_memo", TransitionMemo(0))
+    passing = ["poweron", "scanarea"] + ["checkbattery"] * FAIL_FAST_CHUNK
+    failing = ["scanarea"] + passing
+    body = batch(client, sequences=[{"actions": failing, "auto_expand": False},
+                                    {"actions": passing, "auto_expand": False}],
+                 engine="prolog", fail_fast=True).get_json()
+    assert [r["valid"] for r in body["results"]] == [False, True]
+    # The failing sequence was only sent up to the end of its first chunk
+    assert sum(len(actions) for actions in pool.sent) == FAIL_FAST_CHUNK + len(passing)
+
+
+def test_malformed_entries_get_their_own_errors(client):
+    body = batch(client, sequences=[3, {"actions": 3}, {"actions": VALID}]).get_json()
+    assert body["results"][0] == {"error": "Each sequence must be an object"}
+    assert body["results"][1] == {"error": "Actions must be a string or list"}
+    assert body["results"][2]["valid"] is True
+
+
+def test_bad_requests(client):
+    assert batch(client, sequences=3).status_code == 400
+    assert batch(client, sequences=[], output="full").status_code == 400
+    response = batch(client, sequences=[], output="trace", fail_fast=True)
+    assert response.status_code == 400
+    assert client.post("/verify/batch", json=[1, 2]).status_code == 400
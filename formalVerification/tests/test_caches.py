@@ -0,0 +1,134 @@
+from types import SimpleNamespace
+
+from caches import PrefixTrie, ResponseCache, TransitionMemo
+from disk_cache import DiskCache
+
+
+def make_root():
+    return ["root"], "checkpoint0"
+
+
+def test_memo_evicts_least_recently_used():
+    memo = TransitionMemo(max_size=2)
+    memo.check_version("v1")
+    memo.put(0, "a", "A")
+    memo.put(0, "b", "B")
+    assert memo.get(0, "a") == "A"  # "b" is now the oldest
+    memo.put(0, "c", "C")
+    assert memo.get(0, "b") is None
+    assert memo.get(0, "a") == "A"
+    assert memo.get(0, "c") == "C"
+    assert memo.stats()["evictions"] == 1
+
+
+def test_memo_empties_on_new_rules():
+    memo = TransitionMemo()
+    memo.check_version("v1")
+    memo.put(0, "a", "A")
+    memo.check_version("v2")
+    assert memo.get(0, "a") is None
+
+
+def insert_path(trie, actions):
+    path = trie.lookup("v1", "table", actions, make_root)
+    for action in actions[len(path) - 1:]:
+        path.append(trie.insert(path[-1], action, [action], f"after {action}"))
+    trie.touch(path)
+    return path
+
+
+def test_trie_resumes_from_longest_prefix():
+    trie = PrefixTrie(max_nodes=100)
+    insert_path(trie, ["a", "b", "c"])
+    path = trie.lookup("v1", "table", ["a", "b", "x", "y"], make_root)
+    assert [node.action for node in path] == [None, "a", "b"]
+    assert path[-1].checkpoint == "after b"
+    assert trie.stats()["hits"] == 1
+
+
+def test_trie_evicts_leaves_first():
+    trie = PrefixTrie(max_nodes=4)
+    insert_path(trie, ["a", "b", "c"])  # root + 3 nodes
+    insert_path(trie, ["a", "x"])       # one node over the cap
+    stats = trie.stats()
+    assert stats["nodes"] == 4
+    assert stats["evictions"] == 1
+    # The old branch lost its tip; the shared prefix and new branch stay
+    path = trie.lookup("v1", "table", ["a", "b", "c"], make_root)
+    assert [node.action for node in path] == [None, "a", "b"]
+    path = trie.lookup("v1", "table", ["a", "x"], make_root)
+    assert [node.action for node in path] == [None, "a", "x"]
+
+
+def test_trie_empties_on_new_rules():
+    trie = PrefixTrie()
+    insert_path(trie, ["a"])
+    path = trie.lookup("v2", "table", ["a"], make_root)
+    assert len(path) == 1
+    assert trie.stats()["nodes"] == 1
+
+
+def test_response_cache_keeps_encoded_copies():
+    cache = ResponseCache(max_bytes=100)
+    cache.put("a", bytes(40))
+    cache.put_encoded("a", "gzip", bytes(10))
+    assert cache.get_encoded("a", "gzip") == bytes(10)
+    assert cache.get_encoded("a", "deflate") is None
+    assert cache.stats()["bytes"] == 50
+    # Copies count toward the size limit and go with their entry
+    cache.put("b", bytes(45))
+    cache.put_encoded("b", "gzip", bytes(10))
+    assert cache.get("a") is None
+    assert cache.get_encoded("a", "gzip") is None
+    assert cache.stats()["bytes"] == 55
+
+
+def test_disk_cache_round_trip(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = DiskCache(path)
+    cache.put_response("key1", "v1", b'{"ok": true}')
+    cache.put_table(SimpleNamespace(rules_version="v1", states=[1, 2]))
+
+    # A new connection, as after a restart, sees the same rows
+    cache = DiskCache(path)
+    assert cache.get_response("key1") == b'{"ok": true}'
+    assert cache.get_response("missing") is None
+    assert cache.get_table("v1").states == [1, 2]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_cache_drops_other_rules(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite"))
+    cache.put_response("key1", "v1", b"old")
+    cache.put_table(SimpleNamespace(rules_version="v1"))
+    assert cache.get_table("v2") is None
+    cache.compact("v2")
+    assert cache.get_response("key1") is None
+    assert cache.get_table("v1") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_disk_cache_trims_to_size(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite"), max_bytes=100)
+    for i in range(5):
+        cache.put_response(f"key{i}", "v1", bytes(30))
+    assert cache.stats()["bytes"] <= 90
+    assert cache.get_response("key4") is not None
+    assert cache.get_response("key0") is None
+
+
+def test_disk_cache_misses_after_format_change(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = DiskCache(path, version=1)
+    cache.put_response("key1", "v1", b"body")
+    cache.put_table(SimpleNamespace(rules_version="v1"))
+
+    cache = DiskCache(path, version=1)
+    assert cache.get_response("key1") == b"body"
+
+    # Same rules.pl, newer code: nothing written by the old code is used
+    cache = DiskCache(path, version=2)
+    assert cache.get_response("key1") is None
+    assert cache.get_table("v1") is None
+    assert cache.stats()["bytes"] == 0
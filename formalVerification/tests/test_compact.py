@@ -0,0 +1,80 @@
+import pytest
+
+from conftest import load_baseline
+
+VERIFY = [c for c in load_baseline() if c["endpoint"] == "/verify" and c["status"] == 200]
+
+
+def expand(compact):
+    """Rebuild the fields of the full /verify body that the compact one carries."""
+    conditions = compact["conditions"]
+    names = lambda ids: [conditions[i] for i in ids]
+    state = set(names(compact["initial_state"]))
+    validation = []
+    for i, (a, r, added, removed, met, battery) in enumerate(compact["steps"]):
+        to_state = (state | set(names(added))) - set(names(removed))
+        validation.append({
+            "action": compact["actions"][a],
+            "precondition": compact["preconditions"][a],
+            "result": compact["results"][r],
+            "from_state": sorted(state),
+            "to_state": sorted(to_state),
+            "precondition_met": met,
+        })
+        if battery is not None:  # unknown actions have no battery reading
+            validation[-1]["battery"] = battery
+        if "explanations" in compact:
+            validation[-1]["explanation"] = compact["explanations"][i]
+        state = to_state
+    return {
+        "validation": validation,
+        "summary": compact["summary"],
+        "summary_details": compact["summary_details"],
+        "final_state": names(compact["final_state"]),
+        "final_battery": compact["final_battery"],
+        "nodes": [{"id": i, "step": step, "type": kind, "state": names(ids)}
+                  for i, step, kind, ids in compact["fsm"]["nodes"]],
+        "edges": [{"from": f, "to": t, "action": compact["actions"][a], "step": step, "valid": valid}
+                  for f, t, a, step, valid in compact["fsm"]["edges"]],
+    }
+
+
+def project(full, explain):
+    """The fields of a full /verify body that expand() rebuilds."""
+    keys = ["action", "precondition", "result", "from_state", "to_state",
+            "precondition_met", "battery"] + (["explanation"] if explain else [])
+    return {
+        "validation": [{k: step[k] for k in keys if k in step} for step in full["validation"]],
+        "summary": full["summary"],
+        "summary_details": full["summary_details"],
+        "final_state": full["final_state"],
+        "final_battery": full["final_battery"],
+        "nodes": [{k: node[k] for k in ("id", "step", "type", "state")}
+                  for node in full["fsm"]["nodes"]],
+        "edges": [{k: edge[k] for k in ("from", "to", "action", "step", "valid")}
+                  for edge in full["fsm"]["edges"]],
+    }
+
+
+@pytest.mark.parametrize("explain", [False, True])
+@pytest.mark.parametrize("case", VERIFY, ids=lambda c: str(c["request"]["actions"]))
+def test_compact_carries_the_full_body(client, case, explain):
+    response = client.post("/verify", json=dict(case["request"], format="compact", explain=explain))
+    assert response.status_code == 200
+    compact = response.get_json()
+    assert compact["format"] == "compact"
+    assert ("explanations" in compact) == explain
+    assert expand(compact) == project(case["response"], explain)
+
+
+def test_compact_is_cached_apart_from_full(client):
+    request = VERIFY[0]["request"]
+    etags = {client.post("/verify", json=dict(request, **extra)).get_etag()[0]
+             for extra in ({}, {"format": "compact"}, {"format": "compact", "explain": True})}
+    assert len(etags) == 3
+
+
+def test_unknown_format_is_rejected(client):
+    response = client.post("/verify", json=dict(VERIFY[0]["request"], format="tiny"))
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Format must be 'full', 'compact' or 'verdict'"}
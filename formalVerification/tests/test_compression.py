@@ -0,0 +1,70 @@
+import gzip
+import json
+import zlib
+
+import pytest
+
+from conftest import load_baseline
+
+VERIFY = next(c for c in load_baseline() if c["endpoint"] == "/verify" and c["status"] == 200)
+DECODE = {"gzip": gzip.decompress, "deflate": zlib.decompress}
+
+
+def post(client, accept=None, json_body=None, endpoint="/verify"):
+    headers = {"Accept-Encoding": accept} if accept else {}
+    return client.post(endpoint, json=json_body or VERIFY["request"], headers=headers)
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+def test_large_bodies_are_compressed(client, backend, encoding):
+    plain = post(client)
+    assert len(plain.get_data()) >= backend.COMPRESS_MIN_SIZE
+    assert "Content-Encoding" not in plain.headers
+
+    response = post(client, encoding)
+    assert response.headers["Content-Encoding"] == encoding
+    assert "Accept-Encoding" in response.vary
+    assert DECODE[encoding](response.get_data()) == plain.get_data()
+    # Same resource, different bytes: the ETag turns weak
+    assert response.get_etag() == (plain.get_etag()[0], True)
+
+
+def test_gzip_is_preferred_and_refused_encodings_are_skipped(client):
+    assert post(client, "deflate, gzip").headers["Content-Encoding"] == "gzip"
+    assert post(client, "gzip;q=0, deflate").headers["Content-Encoding"] == "deflate"
+    assert "Content-Encoding" not in post(client, "br").headers
+
+
+def test_small_bodies_are_not_compressed(client, backend, monkeypatch):
+    monkeypatch.setattr(backend, "COMPRESS_MIN_SIZE", 1 << 20)
+    response = post(client, "gzip")
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json() == VERIFY["response"]
+    assert response.get_etag()[1] is False
+
+
+def test_compressed_copies_are_cached(client, backend, monkeypatch):
+    first = post(client, "gzip")
+    monkeypatch.setattr(backend, "compress_body", None)  # served from the cache now
+    second = post(client, "gzip")
+    assert second.get_data() == first.get_data()
+
+
+def test_uncached_responses_are_compressed_by_the_hook(client, backend, monkeypatch):
+    monkeypatch.setattr(backend, "COMPRESS_MIN_SIZE", 1)
+    batch = {"sequences": [{"actions": VERIFY["request"]["actions"]}] * 3}
+    plain = post(client, json_body=batch, endpoint="/verify/batch")
+    response = post(client, "gzip", batch, "/verify/batch")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.vary
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+
+
+def test_fast_json_matches_the_default_provider(backend):
+    from flask.json.provider import DefaultJSONProvider
+    default = DefaultJSONProvider(backend.app)
+    body = VERIFY["response"]
+    assert json.loads(backend.app.json.dumps(body)) == json.loads(default.dumps(body))
+    with backend.app.app_context():
+        fast = backend.app.json.response(body).get_data()
+        assert json.loads(fast) == json.loads(default.response(body).get_data())
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from engine import PrologQueryError, prolog_trace
+from verifier import iter_verification
+
+
+class RefusingProlog:
+    """Answers verify_sequence/3 queries, failing any that contain 'stuck'."""
+
+    def query(self, query):
+        if "'stuck'" in query:
+            return []
+        actions = query.split("verify_sequence(World0, [")[1].split("]")[0]
+        count = len(actions.split(",")) if actions else 0
+        return [{"World0": [], "Trace": [("step", "valid", [], [], [])] * count}]
+
+
+def random_sequences(table, count=40, max_len=30, seed=7):
+    rng = random.Random(seed)
+    actions = sorted(table.actions) + ["not_an_action"]
+    return [[rng.choice(actions) for _ in range(rng.randint(0, max_len))]
+            for _ in range(count)]
+
+
+def test_table_trace_matches_prolog(verifier):
+    table = verifier.table
+    sequences = random_sequences(table)
+    _, table_traces = verifier.traces(sequences, "table")
+    _, prolog_traces = verifier.traces(sequences, "prolog")
+    assert [list(trace) for trace in table_traces] == prolog_traces
+
+
+def test_lazy_prolog_trace_matches_table(verifier):
+    table = verifier.table
+    actions = random_sequences(table, count=1, max_len=600, seed=3)[0]
+    _, lazy = verifier.trace(actions, "prolog", lazy=True)
+    _, eager = verifier.trace(actions, "table")
+    assert list(lazy) == list(eager)
+
+
+def test_trie_resume_matches_fresh_verification(verifier):
+    table = verifier.table
+    sequences = random_sequences(table, count=10, max_len=20, seed=11)
+    # Shared prefixes make later sequences resume from cached checkpoints
+    sequences += [seq + ["poweron", "scanarea"] for seq in sequences]
+    for actions in sequences:
+        _, trace = verifier.trace(actions, "table")
+        fresh = list(iter_verification(table, table.initial_world, trace))
+        assert list(verifier.events(actions, "table")) == fresh
+    assert verifier.prefix_trie.stats()["hits"] > 0
+
+
+def test_failed_prolog_query_names_the_action():
+    _, trace = prolog_trace(RefusingProlog(), ["poweron", "scanarea"], ())
+    assert [entry[1] for entry in trace] == ["valid", "valid"]
+    with pytest.raises(PrologQueryError, match="step 3, action 'stuck'"):
+        prolog_trace(RefusingProlog(), ["poweron", "scanarea", "stuck", "poweroff"], ())
@@ -0,0 +1,46 @@
+from conftest import TablePool
+from prolog_pool import PrologPool
+from verifier import Verifier
+
+
+def test_retired_pool_waits_for_its_holders():
+    pool = PrologPool(1)
+    assert pool.acquire()
+    pool.retire()
+    assert not pool._executor._shutdown_thread
+    assert not pool.acquire()
+    pool.release()
+    assert pool._executor._shutdown_thread
+
+
+def test_reload_between_engines_and_acquire_takes_new_pair(table):
+    old = PrologPool(1)
+    old.retire()
+    new = TablePool(table)
+    pairs = iter([(old, "old table"), (new, table)])
+    verifier = Verifier(engine="prolog")
+    verifier.engines = lambda: next(pairs)
+    assert verifier.acquire_engines() == (new, table)
+
+
+def test_every_prolog_path_releases_the_pool(table):
+    pool = TablePool(table)
+    verifier = Verifier(engine="prolog")
+    verifier.engines = lambda: (pool, table)
+    actions = ["poweron", "scanarea", "fly"]
+
+    _, trace = verifier.trace(actions)
+    assert pool.users == 0 and len(trace) == 3
+    _, traces = verifier.traces([actions, actions[:1]])
+    assert pool.users == 0 and [len(t) for t in traces] == [3, 1]
+    _, traces = verifier.traces([actions], fail_fast=True)
+    assert pool.users == 0
+    events = verifier.events(actions)
+    next(events)
+    assert pool.users == 1
+    list(events)
+    assert pool.users == 0
+    _, lazy = verifier.trace(actions, lazy=True)
+    assert pool.users == 1
+    assert len(list(lazy)) == 3
+    assert pool.users == 0
@@ -0,0 +1,62 @@
+from conftest import load_baseline
+
+BASELINE = load_baseline()
+VERIFY = next(c for c in BASELINE if c["endpoint"] == "/verify" and c["status"] == 200)
+FSM = next(c for c in BASELINE if c["endpoint"] == "/fsm")
+
+
+def test_if_none_match_answers_304(client):
+    for case in (VERIFY, FSM):
+        first = client.post(case["endpoint"], json=case["request"])
+        etag, weak = first.get_etag()
+        assert etag and not weak
+        for header in (f'"{etag}"', f'W/"{etag}"'):
+            response = client.post(case["endpoint"], json=case["request"],
+                                   headers={"If-None-Match": header})
+            assert response.status_code == 304
+            assert response.get_etag() == (etag, False)
+            assert response.get_data() == b""
+
+
+def test_stale_etag_gets_the_body(client):
+    etag = client.post("/verify", json=VERIFY["request"]).get_etag()[0]
+    response = client.post("/verify", json=dict(VERIFY["request"], actions=["poweron"]),
+                           headers={"If-None-Match": f'"{etag}"'})
+    assert response.status_code == 200
+    assert response.get_etag()[0] != etag
+
+
+def test_etag_depends_on_endpoint_and_rules(client, backend, monkeypatch):
+    verify = client.post("/verify", json=FSM["request"]).get_etag()[0]
+    fsm = client.post("/fsm", json=FSM["request"]).get_etag()[0]
+    assert verify != fsm
+
+    from conftest import make_table
+    table = make_table(rules_version="edited-rules")
+    monkeypatch.setattr(backend.verifier, "engines", lambda: (None, table))
+    response = client.post("/fsm", json=FSM["request"], headers={"If-None-Match": f'"{fsm}"'})
+    assert response.status_code == 200
+    assert response.get_etag()[0] != fsm
+    assert response.get_json() == FSM["response"]
+
+
+def test_errors_are_not_cached(client, backend):
+    for _ in range(2):
+        response = client.post("/verify", json=dict(VERIFY["request"], format="bogus"))
+        assert response.status_code == 400
+        assert response.get_etag() == (None, None)
+    assert backend.response_cache.stats()["hits"] == 0
+
+
+def test_disk_cache_answers_after_memory_is_cleared(client, backend, monkeypatch, tmp_path):
+    from caches import ResponseCache
+    from disk_cache import DiskCache
+    disk = DiskCache(str(tmp_path / "cache.sqlite"), 1 << 20, backend.FORMAT_VERSION)
+    monkeypatch.setattr(backend, "disk_cache", disk)
+    first = client.post("/verify", json=VERIFY["request"])
+
+    monkeypatch.setattr(backend, "response_cache", ResponseCache())
+    monkeypatch.setattr(backend.verifier, "events", None)  # the body comes from disk
+    response = client.post("/verify", json=VERIFY["request"])
+    assert response.get_data() == first.get_data()
+    assert response.get_etag() == first.get_etag()
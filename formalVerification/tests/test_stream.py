@@ -0,0 +1,40 @@
+import json
+
+from conftest import load_baseline
+
+BASELINE = load_baseline()
+
+
+def stream(client, payload):
+    response = client.post("/verify?stream=ndjson", json=payload)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_stream_carries_the_full_body(client):
+    for case in BASELINE:
+        if case["endpoint"] != "/verify":
+            continue
+        body = case["response"]
+        lines = stream(client, case["request"])
+        assert [l["node"] for l in lines if l["type"] == "node"] == body["fsm"]["nodes"]
+        steps = [l for l in lines if l["type"] == "step"]
+        assert [l["validation"] for l in steps] == body["validation"]
+        assert [l["step"] for l in steps] == list(range(1, len(steps) + 1))
+        assert [l["edge"] for l in steps if l["edge"] is not None] == body["fsm"]["edges"]
+        assert lines[-1]["type"] == "summary"
+        assert lines[-1]["summary"] == body["summary"]
+
+
+def test_stream_resumes_from_the_trie(client, backend):
+    payload = {"actions": ["poweron", "scanarea", "checkbattery"], "auto_expand": False}
+    first = stream(client, payload)
+    longer = stream(client, {**payload, "actions": payload["actions"] + ["stop"]})
+    assert longer[:-1][:len(first) - 1] == first[:-1]
+    assert backend.verifier.prefix_trie.stats()["hits"] == 1
+
+
+def test_stream_rejects_bad_payloads(client):
+    response = client.post("/verify?stream=ndjson", json={"actions": 3})
+    assert response.status_code == 400
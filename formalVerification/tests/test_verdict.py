@@ -0,0 +1,33 @@
+import pytest
+
+SEQUENCE = ["scanarea", "poweron", "fly", "scanarea", "checkbattery"]
+
+
+def verify(client, **payload):
+    return client.post("/verify", json={"actions": SEQUENCE, "auto_expand": False, **payload})
+
+
+def test_verdict(client):
+    body = verify(client, format="verdict").get_json()
+    assert body == {"valid": False, "steps": 5, "invalid_count": 2, "first_invalid": 0}
+
+
+def test_verdict_fail_fast(client):
+    body = verify(client, format="verdict", fail_fast=True).get_json()
+    assert body == {"valid": False, "steps": 1, "invalid_count": 1, "first_invalid": 0}
+
+
+def test_verdict_agrees_with_full_body(client):
+    full = verify(client).get_json()
+    verdict = verify(client, format="verdict").get_json()
+    invalid = [v for v in full["validation"] if v["result"] != "valid"]
+    assert verdict["invalid_count"] == len(invalid)
+    assert verdict["steps"] == len(full["validation"])
+
+
+@pytest.mark.parametrize("name", ["fail_fast", "explain"])
+@pytest.mark.parametrize("value", ["false", 0, 1, None])
+def test_flags_must_be_booleans(client, name, value):
+    response = verify(client, format="verdict", **{name: value})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": f"{name} must be true or false"}
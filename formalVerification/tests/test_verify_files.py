@@ -0,0 +1,92 @@
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import verify_files
+from conftest import make_table
+
+VALID = ["poweron", "scanarea", "pickobject", "releaseobject", "poweroff"]
+INVALID = ["poweron", "moveleft", "scanarea", "stop"]
+
+
+class TableVerifier:
+    """Stands in for Verifier in main(), compiling rules.pl without Prolog."""
+
+    def __init__(self, rules_path=None, workers=None):
+        self.table = make_table()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def sequences(tmp_path):
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "valid.txt").write_text("\n".join(VALID) + "\n\n", encoding="utf-8")
+    (tmp_path / "nested" / "invalid.txt").write_text("\n".join(INVALID), encoding="utf-8")
+    (tmp_path / "notes.md").write_text("not a sequence", encoding="utf-8")
+    return tmp_path
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    """This process set up as a table worker, see _init_worker()."""
+    monkeypatch.setattr(verify_files, "_table", make_table())
+
+
+def test_collect_files(sequences):
+    expected = [str(sequences / "nested" / "invalid.txt"), str(sequences / "valid.txt")]
+    assert verify_files.collect_files([str(sequences)]) == expected
+    assert verify_files.collect_files([str(sequences / "**" / "*.txt"), expected[1]]) == expected
+
+
+def test_verify_file(sequences, worker):
+    valid = verify_files.verify_file(str(sequences / "valid.txt"))
+    assert valid["valid"] and valid["steps"] == len(VALID)
+    assert "first_invalid_action" not in valid
+
+    invalid = verify_files.verify_file(str(sequences / "nested" / "invalid.txt"))
+    assert not invalid["valid"] and invalid["steps"] == len(INVALID)
+    assert invalid["first_invalid_action"] == "moveleft"
+    assert invalid["first_invalid"] == 1
+
+    stopped = verify_files.verify_file(str(sequences / "nested" / "invalid.txt"), fail_fast=True)
+    assert stopped["steps"] == 2 and stopped["first_invalid_action"] == "moveleft"
+
+
+def test_unreadable_file_is_an_error(tmp_path, worker):
+    path = tmp_path / "binary.txt"
+    path.write_bytes(b"\xff\xfe\x00")
+    result = verify_files.verify_file(str(path))
+    assert result["error"].startswith("Could not read file")
+
+
+def test_main_json_report(sequences, monkeypatch, capsys):
+    monkeypatch.setattr(verify_files, "Verifier", TableVerifier)
+    assert verify_files.main([str(sequences), "--workers", "2"]) == 1
+    report = json.loads(capsys.readouterr().out)
+    assert (report["count"], report["valid_count"], report["invalid_count"],
+            report["error_count"]) == (2, 1, 1, 0)
+    assert [r["valid"] for r in report["results"]] == [False, True]
+
+    assert verify_files.main([str(sequences / "valid.txt"), "--workers", "1"]) == 0
+
+
+def test_main_junit_report(sequences, monkeypatch, tmp_path):
+    monkeypatch.setattr(verify_files, "Verifier", TableVerifier)
+    output = tmp_path / "report.xml"
+    verify_files.main([str(sequences), "--format", "junit", "--output", str(output)])
+    suite = ET.parse(output).getroot()
+    assert (suite.get("tests"), suite.get("failures"), suite.get("errors")) == ("2", "1", "0")
+    failures = [case.find("failure") for case in suite.iter("testcase")]
+    assert failures[1] is None
+    assert failures[0].get("message") == "Step 2 'moveleft': precondition_failed"
+
+
+def test_main_without_files_exits(tmp_path):
+    with pytest.raises(SystemExit):
+        verify_files.main([str(tmp_path)])
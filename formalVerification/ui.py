@@ -1,17 +1,30 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool
+from urllib3.connection import HTTPConnection
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.patches import Rectangle, Circle, FancyBboxPatch, FancyArrowPatch
+from matplotlib.collections import EllipseCollection, LineCollection, PolyCollection
 from matplotlib.animation import FuncAnimation
-import networkx as nx
 import numpy as np
 import threading
 import time
+import socket
+import json
+import queue
+from collections import namedtuple
 
 API_URL = "http://127.0.0.1:5000/verify"
 
+# Seconds to wait for a connection, and for the verification result
+REQUEST_TIMEOUT = (5, 300)
+
+# How often the main loop checks for finished requests (ms)
+POLL_INTERVAL_MS = 50
+
 AVAILABLE_ACTIONS = [
     "poweron",
     "poweroff",
@@ -31,11 +44,84 @@ AVAILABLE_ACTIONS = [
 animation_data = None
 current_animation_step = 0
 is_animating = False
-animation_thread = None
+
+# Playback runs on root.after timers. The step shown is worked out from the
+# time since (start time, start step) of animation_clock, so frames that
+# would have come up while a slow one was drawing are skipped.
+ANIMATION_SPEEDS = ["0.5", "1", "2", "5", "10", "25", "100"]  # steps per second
+animation_speed = 1.0
+animation_clock = None
+animation_job = None  # root.after id of the next playback tick
+scrub_target = 0
+scrub_job = None  # root.after_idle id of a pending slider redraw
 
 # Global manually placed objects (x, y coordinates)
 manual_objects = []
 
+# (validation data, manual objects, WarehouseTimeline) of the last animation
+warehouse_timeline = None
+
+# WarehouseView of the visualization panel
+warehouse_view = None
+
+# (fsm data, FSMLayout) of the last FSM shown, and its FSMLabels
+fsm_layout = None
+fsm_labels = None
+
+class CancellableAdapter(HTTPAdapter):
+    """HTTPAdapter whose requests can be aborted from another thread.
+
+    Its connections note which thread is waiting on them, from sending a
+    request until the response headers arrive, so abort() can shut that
+    socket down and end the wait. Only public urllib3 API is used: the
+    pool's ConnectionCls and the http.client request()/getresponse().
+    """
+
+    def __init__(self, **kwargs):
+        self.waiting = {}  # thread id -> connection waiting for headers
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        waiting = self.waiting
+
+        class Connection(HTTPConnection):
+            def request(self, *args, **kwargs):
+                waiting[threading.get_ident()] = self
+                return super().request(*args, **kwargs)
+
+            def getresponse(self, *args, **kwargs):
+                try:
+                    return super().getresponse(*args, **kwargs)
+                finally:
+                    waiting.pop(threading.get_ident(), None)
+
+        class Pool(HTTPConnectionPool):
+            ConnectionCls = Connection
+
+        self.poolmanager.pool_classes_by_scheme = dict(
+            self.poolmanager.pool_classes_by_scheme, http=Pool)
+
+    def abort(self, thread_id):
+        """Break the connection a thread is waiting on, if any."""
+        conn = self.waiting.pop(thread_id, None)
+        sock = getattr(conn, "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+# Backend requests run on worker threads and share one connection pool.
+# Workers put (request id, kind, value) on verify_results; the Tk main loop
+# reads it in poll_verification().
+http_adapter = CancellableAdapter(pool_connections=1, pool_maxsize=4)
+http_session = requests.Session()
+http_session.mount("http://", http_adapter)
+verify_results = queue.Queue()
+verify_request = None  # (request id, cancel event, worker thread) while one runs
+verify_counter = 0
+
 def draw_warehouse_base(ax, grid_width, grid_height):
     """Draw the base warehouse layout."""
     # Draw warehouse floor
@@ -61,321 +147,472 @@ def draw_warehouse_base(ax, grid_width, grid_height):
         ax.add_patch(shelf_left)
         ax.add_patch(shelf_right)
 
-def visualize_warehouse_frame(validation_data, ax, canvas, frame_step=None):
-    """Visualize robot movement in a warehouse floor plan - single frame."""
-    if not validation_data:
-        return
-    
-    ax.clear()
-    
-    # Warehouse grid dimensions
-    grid_width = 10
-    grid_height = 8
-    
-    # Draw base warehouse
-    draw_warehouse_base(ax, grid_width, grid_height)
-    
-    # Initialize robot position (start at bottom-left)
-    robot_x = 1.0
-    robot_y = 1.0
-    robot_path = [(robot_x, robot_y)]
-    
-    # Track objects and their positions
-    objects = []
-    scanned_areas = []
-    picked_objects = []
-    target_object = None  # Track the object we're moving toward
-    
-    # Add manually placed objects
-    for obj_x, obj_y in manual_objects:
-        # Check if this manual object hasn't been picked
-        obj_picked = any(abs(px - obj_x) < 0.5 and abs(py - obj_y) < 0.5 for px, py in picked_objects)
-        if not obj_picked:
-            objects.append((obj_x, obj_y, "manual"))
-    
-    # Determine how many steps to show
-    max_step = len(validation_data) if frame_step is None else min(frame_step + 1, len(validation_data))
-    
-    # Check if we need to target a manual object (if pickobject is coming and we have manual objects)
-    # Manual objects take priority over detected objects
-    if manual_objects and max_step > 0:
-        # Look ahead to see if pickobject is in the sequence
-        has_pickobject = any(item.get("action", "").lower() == "pickobject" for item in validation_data[:max_step])
-        if has_pickobject:
-            # Find the nearest manual object to the starting position
-            nearest_obj = None
-            min_dist = float('inf')
-            for obj_x, obj_y in manual_objects:
-                # Check if this object hasn't been picked
-                obj_picked = any(abs(px - obj_x) < 0.5 and abs(py - obj_y) < 0.5 for px, py in picked_objects)
-                if not obj_picked:
-                    dist = ((obj_x - robot_x)**2 + (obj_y - robot_y)**2)**0.5
-                    if dist < min_dist:
-                        min_dist = dist
-                        nearest_obj = (obj_x, obj_y)
-            if nearest_obj:
-                target_object = nearest_obj  # Set manual object as target (overrides any detected object)
-    
-    # Process each action to build the path up to current frame
-    for i in range(max_step):
-        item = validation_data[i]
+class WarehouseWalk:
+    """Robot, path, objects and picks as the warehouse view replays a sequence.
+
+    step() applies one validation entry. `next_action` is the action of the
+    following entry when the view can see it, or None for the last step of
+    a frame, which gets no lookahead (no auto-move toward the next pick).
+    """
+
+    def __init__(self, manual_objects, grid_width, grid_height, target=None):
+        self.manual_objects = manual_objects
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.robot_x = 1.0
+        self.robot_y = 1.0
+        self.path = [(self.robot_x, self.robot_y)]
+        self.objects = [(obj_x, obj_y, "manual") for obj_x, obj_y in manual_objects]
+        self.scanned = []
+        self.picked = []
+        self.target = target  # Object we're moving toward
+        self.picked_manual = set()  # Indexes of manual objects with a pick on them
+        self._frozen_objects = None
+
+    def last_step(self, item):
+        """Return a copy after `item` as the final step of a frame.
+
+        Only the points the step adds go in the copy's path, scanned and
+        picked lists; everything before them is in this walk's.
+        """
+        walk = WarehouseWalk.__new__(WarehouseWalk)
+        walk.manual_objects = self.manual_objects
+        walk.grid_width = self.grid_width
+        walk.grid_height = self.grid_height
+        walk.robot_x = self.robot_x
+        walk.robot_y = self.robot_y
+        walk.path = []
+        walk.objects = list(self.objects)
+        walk.scanned = []
+        walk.picked = []
+        walk.target = self.target
+        walk.picked_manual = None  # Only needed for lookahead
+        walk._frozen_objects = self.frozen_objects()
+        walk.step(item, None)
+        return walk
+
+    def frozen_objects(self):
+        """The current objects as a tuple, shared until they change."""
+        if self._frozen_objects is None:
+            self._frozen_objects = tuple(self.objects)
+        return self._frozen_objects
+
+    def nearest_manual_object(self):
+        """Nearest manual object that hasn't been picked, or None."""
+        nearest_obj = None
+        min_dist = float('inf')
+        for idx, (obj_x, obj_y) in enumerate(self.manual_objects):
+            if idx not in self.picked_manual:
+                dist = ((obj_x - self.robot_x)**2 + (obj_y - self.robot_y)**2)**0.5
+                if dist < min_dist:
+                    min_dist = dist
+                    nearest_obj = (obj_x, obj_y)
+        return nearest_obj
+
+    def check_target_reached(self):
+        if self.target:
+            dist_to_target = ((self.target[0] - self.robot_x)**2 + (self.target[1] - self.robot_y)**2)**0.5
+            if dist_to_target < 1.0:
+                self.target = None  # Reached the object
+
+    def approach_target(self):
+        """Automatically move robot toward the target (max 5 auto-moves)."""
+        dist_y = self.target[1] - self.robot_y
+        steps_needed = max(1, int((dist_y - 0.5) / 1.5))
+        for step in range(min(steps_needed, 5)):
+            if self.robot_y < self.target[1] - 0.5:
+                self.robot_y = min(self.robot_y + 1.5, self.target[1] - 0.3, self.grid_height - 1.5)
+                self.path.append((self.robot_x, self.robot_y))
+                # Check if we've reached it
+                new_dist = ((self.target[0] - self.robot_x)**2 + (self.target[1] - self.robot_y)**2)**0.5
+                if new_dist < 1.0:
+                    self.target = None
+                    break
+
+    def pick(self, idx):
+        obj = self.objects.pop(idx)
+        self._frozen_objects = None
+        self.picked.append((obj[0], obj[1]))
+        if self.manual_objects and self.picked_manual is not None:
+            # Manual objects near the pick count as picked from now on
+            for m, (obj_x, obj_y) in enumerate(self.manual_objects):
+                if abs(obj[0] - obj_x) < 0.5 and abs(obj[1] - obj_y) < 0.5:
+                    self.picked_manual.add(m)
+
+    def step(self, item, next_action):
         action = item.get("action", "")
-        result = item.get("result", "")
-        is_valid = result == "valid"
-        
-        # Get state information
-        to_state = item.get("to_state", [])
-        to_state_str = str(to_state).lower()
-        
+        is_valid = item.get("result", "") == "valid"
+        to_state_str = str(item.get("to_state", [])).lower()
+
         # If we don't have a target yet and pickobject is coming, check for manual objects
-        if not target_object and i < max_step - 1:
-            next_item = validation_data[min(i + 1, max_step - 1)]
-            next_action = next_item.get("action", "")
-            if next_action == "pickobject":
-                # Find nearest manual object that hasn't been picked
-                nearest_obj = None
-                min_dist = float('inf')
-                for obj_x, obj_y in manual_objects:
-                    # Check if this object hasn't been picked
-                    obj_picked = any(abs(px - obj_x) < 0.5 and abs(py - obj_y) < 0.5 for px, py in picked_objects)
-                    if not obj_picked:
-                        dist = ((obj_x - robot_x)**2 + (obj_y - robot_y)**2)**0.5
-                        if dist < min_dist:
-                            min_dist = dist
-                            nearest_obj = (obj_x, obj_y)
-                if nearest_obj:
-                    target_object = nearest_obj
-        
+        if not self.target and next_action == "pickobject":
+            nearest_obj = self.nearest_manual_object()
+            if nearest_obj:
+                self.target = nearest_obj
+
         if action == "scanarea" and is_valid:
             # Scanning - mark the area
-            scanned_areas.append((robot_x, robot_y))
-            # After scanning, if object_detected is in state, place an object ahead
-            # BUT only if we don't already have manual objects (manual objects take priority)
-            from_state = item.get("from_state", [])
-            from_state_str = str(from_state).lower()
-            if "object_detected" in to_state_str or "object_detected" in from_state_str:
-                # Only create detected object if we don't have manual objects
-                # Manual objects should be used as targets instead
-                if not manual_objects:
-                    # Place object 2-3 cells ahead in the path (upward)
-                    obj_x = robot_x  # Same X position
-                    obj_y = min(robot_y + 2.5, grid_height - 1.5)  # Ahead (upward)
-                    # Check if object already exists at this position
-                    obj_exists = any(abs(o[0] - obj_x) < 0.5 and abs(o[1] - obj_y) < 0.5 for o in objects)
-                    if not obj_exists:
-                        objects.append((obj_x, obj_y, "detected"))
-                        # Set this as the target object to move toward (only if no manual objects)
-                        if not target_object:
-                            target_object = (obj_x, obj_y)
-                        
-                        # Check if next action is pickobject - if so, auto-move to object immediately
-                        if i < max_step - 1:
-                            next_item = validation_data[min(i + 1, max_step - 1)]
-                            next_action = next_item.get("action", "")
-                            if next_action == "pickobject" and target_object == (obj_x, obj_y):
-                                # Calculate steps needed to reach object
-                                dist_y = target_object[1] - robot_y
-                                if dist_y > 0:
-                                    steps_needed = max(1, int((dist_y - 0.5) / 1.5))
-                                    # Automatically move robot toward object (show intermediate steps)
-                                    for step in range(min(steps_needed, 5)):  # Max 5 auto-moves
-                                        if robot_y < target_object[1] - 0.5:
-                                            robot_y = min(robot_y + 1.5, target_object[1] - 0.3, grid_height - 1.5)
-                                            robot_path.append((robot_x, robot_y))
-                                            # Check if we've reached it
-                                            new_dist = ((target_object[0] - robot_x)**2 + (target_object[1] - robot_y)**2)**0.5
-                                            if new_dist < 1.0:
-                                                target_object = None
-                                                break
-        
+            self.scanned.append((self.robot_x, self.robot_y))
+            # After scanning, if object_detected is in state, place an object
+            # ahead, but only without manual objects (those take priority)
+            from_state_str = str(item.get("from_state", [])).lower()
+            if ("object_detected" in to_state_str or "object_detected" in from_state_str) \
+                    and not self.manual_objects:
+                # Place object 2-3 cells ahead in the path (upward)
+                obj_x = self.robot_x
+                obj_y = min(self.robot_y + 2.5, self.grid_height - 1.5)
+                obj_exists = any(abs(o[0] - obj_x) < 0.5 and abs(o[1] - obj_y) < 0.5 for o in self.objects)
+                if not obj_exists:
+                    self.objects.append((obj_x, obj_y, "detected"))
+                    self._frozen_objects = None
+                    if not self.target:
+                        self.target = (obj_x, obj_y)
+                    # If next action is pickobject, auto-move to object immediately
+                    if next_action == "pickobject" and self.target == (obj_x, obj_y):
+                        if self.target[1] - self.robot_y > 0:
+                            self.approach_target()
+
         elif action == "moveforward" and is_valid:
             # Move forward (upward in our grid)
-            robot_y = min(robot_y + 1.5, grid_height - 1.5)
-            robot_path.append((robot_x, robot_y))
-            # Check if we've reached the target object
-            if target_object:
-                dist_to_target = ((target_object[0] - robot_x)**2 + (target_object[1] - robot_y)**2)**0.5
-                if dist_to_target < 1.0:
-                    target_object = None  # Reached the object
-        
+            self.robot_y = min(self.robot_y + 1.5, self.grid_height - 1.5)
+            self.path.append((self.robot_x, self.robot_y))
+            self.check_target_reached()
+
         elif action == "moveleft" and is_valid:
-            # Move left (decrease X)
-            robot_x = max(robot_x - 1.5, 0.5)
-            robot_path.append((robot_x, robot_y))
-            # Check if we've reached the target object
-            if target_object:
-                dist_to_target = ((target_object[0] - robot_x)**2 + (target_object[1] - robot_y)**2)**0.5
-                if dist_to_target < 1.0:
-                    target_object = None  # Reached the object
-        
+            self.robot_x = max(self.robot_x - 1.5, 0.5)
+            self.path.append((self.robot_x, self.robot_y))
+            self.check_target_reached()
+
         elif action == "moveright" and is_valid:
-            # Move right (increase X)
-            robot_x = min(robot_x + 1.5, grid_width - 0.5)
-            robot_path.append((robot_x, robot_y))
-            # Check if we've reached the target object
-            if target_object:
-                dist_to_target = ((target_object[0] - robot_x)**2 + (target_object[1] - robot_y)**2)**0.5
-                if dist_to_target < 1.0:
-                    target_object = None  # Reached the object
-        
-        # Auto-move toward target object (detected or manual) if next action is pickobject
-        # This happens after processing the current action, regardless of what it was
-        if target_object and i < max_step - 1:
-            next_item = validation_data[min(i + 1, max_step - 1)]
-            next_action = next_item.get("action", "")
+            self.robot_x = min(self.robot_x + 1.5, self.grid_width - 0.5)
+            self.path.append((self.robot_x, self.robot_y))
+            self.check_target_reached()
+
+        # Auto-move toward target object (detected or manual) if next action
+        # is pickobject. While there is a target and a next action, a pick in
+        # this step is not processed.
+        if self.target and next_action is not None:
             if next_action == "pickobject":
-                dist_x = target_object[0] - robot_x
-                dist_y = target_object[1] - robot_y
+                dist_x = self.target[0] - self.robot_x
+                dist_y = self.target[1] - self.robot_y
                 dist = (dist_x**2 + dist_y**2)**0.5
-                
-                # If we're not close enough, automatically move toward it
-                # Move multiple steps if needed (similar to detected objects after scanning)
                 if dist > 1.0 and dist_y > 0:  # Object is ahead
-                    # Calculate how many steps we need
-                    steps_needed = max(1, int((dist_y - 0.5) / 1.5))
-                    # Automatically move robot toward object (show intermediate steps)
-                    for step in range(min(steps_needed, 5)):  # Max 5 auto-moves
-                        if robot_y < target_object[1] - 0.5:
-                            robot_y = min(robot_y + 1.5, target_object[1] - 0.3, grid_height - 1.5)
-                            robot_path.append((robot_x, robot_y))
-                            # Check if we've reached it
-                            new_dist = ((target_object[0] - robot_x)**2 + (target_object[1] - robot_y)**2)**0.5
-                            if new_dist < 1.0:
-                                target_object = None  # Reached the object
-                                break
-        
+                    self.approach_target()
+
         elif action == "pickobject" and is_valid:
-            # Picking object - only pick if object_detected was removed from state
-            # This means the object was actually successfully picked
-            from_state = item.get("from_state", [])
-            from_state_str = str(from_state).lower()
-            to_state_str = str(to_state).lower()
-            
-            # Check if object_detected was in from_state but not in to_state (was removed)
-            had_object = "object_detected" in from_state_str
+            # Only pick if object_detected was removed from the state
+            had_object = "object_detected" in str(item.get("from_state", [])).lower()
             object_removed = "object_detected" not in to_state_str and had_object
-            
             if object_removed:
                 # Find nearest object to robot and mark as picked
-                nearest_obj = None
+                nearest_idx = None
                 min_dist = float('inf')
-                for idx, obj in enumerate(objects):
-                    dist = ((obj[0] - robot_x)**2 + (obj[1] - robot_y)**2)**0.5
+                for idx, obj in enumerate(self.objects):
+                    dist = ((obj[0] - self.robot_x)**2 + (obj[1] - self.robot_y)**2)**0.5
                     if dist < min_dist and dist < 1.5:
                         min_dist = dist
-                        nearest_obj = (idx, obj)
-                
-                if nearest_obj:
-                    idx, obj = nearest_obj
-                    picked_objects.append((obj[0], obj[1]))
-                    objects.pop(idx)
-    
-    # Draw scanned areas (yellow highlight)
-    for sx, sy in scanned_areas:
-        scan_area = Circle((sx, sy), 0.4, facecolor='yellow', 
-                          edgecolor='orange', linewidth=2, alpha=0.4)
-        ax.add_patch(scan_area)
-        ax.text(sx, sy, 'SCAN', ha='center', va='center', 
-               fontsize=7, fontweight='bold', color='darkorange')
-    
-    # Draw objects (boxes)
-    for obj_x, obj_y, status in objects:
-        if status == "detected" or status == "manual":
-            # Manual objects are orange, detected objects are green
-            if status == "manual":
-                obj_box = Rectangle((obj_x - 0.3, obj_y - 0.3), 0.6, 0.6,
-                                  facecolor='#FF9800', edgecolor='#F57C00', linewidth=2)
-            else:
-                obj_box = Rectangle((obj_x - 0.3, obj_y - 0.3), 0.6, 0.6,
-                                  facecolor='#4CAF50', edgecolor='#2d8659', linewidth=2)
-            ax.add_patch(obj_box)
-            ax.text(obj_x, obj_y, '📦', ha='center', va='center', fontsize=12)
-    
-    # Draw picked objects (marked as collected)
-    for px, py in picked_objects:
-        picked_mark = Circle((px, py), 0.2, facecolor='#2196F3', 
-                           edgecolor='#1976D2', linewidth=2, alpha=0.6)
-        ax.add_patch(picked_mark)
-        ax.text(px, py, '✓', ha='center', va='center', 
-               fontsize=10, fontweight='bold', color='white')
-    
-    # Draw robot path
-    if len(robot_path) > 1:
-        path_x = [p[0] for p in robot_path]
-        path_y = [p[1] for p in robot_path]
-        ax.plot(path_x, path_y, 'b--', linewidth=2, alpha=0.5, label='Robot Path')
-    
-    # Draw robot at current position
-    robot = Circle((robot_x, robot_y), 0.35, facecolor='#f44336', 
-                  edgecolor='#c62828', linewidth=3)
-    ax.add_patch(robot)
-    ax.text(robot_x, robot_y, '🤖', ha='center', va='center', fontsize=14)
-    
-    # Draw start position marker
-    start_x, start_y = robot_path[0]
-    start_mark = Circle((start_x, start_y), 0.15, facecolor='#4CAF50', 
-                       edgecolor='#2d8659', linewidth=2)
-    ax.add_patch(start_mark)
-    ax.text(start_x, start_y - 0.6, 'START', ha='center', va='top', 
-           fontsize=8, fontweight='bold', color='#2d8659')
-    
-    # Add action labels along the path with step numbers
-    step_num = 1
-    for i in range(max_step):
-        item = validation_data[i]
-        action = item.get("action", "")
-        result = item.get("result", "")
-        if result == "valid":
-            # Calculate position for this step
-            temp_x, temp_y = 1.0, 1.0
-            for j in range(i + 1):
-                if j < len(validation_data):
-                    temp_item = validation_data[j]
-                    temp_action = temp_item.get("action", "")
-                    temp_result = temp_item.get("result", "")
-                    if temp_action == "moveforward" and temp_result == "valid":
-                        temp_y = min(temp_y + 1.5, grid_height - 1.5)
-            
-            x, y = temp_x, temp_y
-            
-            # Place label offset from path to avoid overlap
-            offset_x = 0.4 if step_num % 2 == 0 else -0.4
-            label_x = x + offset_x
-            label_y = y + 0.4
-            
-            # Draw step number circle
-            step_circle = Circle((x, y), 0.25, facecolor='white', 
-                               edgecolor='#2196F3', linewidth=2)
-            ax.add_patch(step_circle)
-            ax.text(x, y, str(step_num), ha='center', va='center', 
-                   fontsize=8, fontweight='bold', color='#2196F3')
-            
-            # Draw action label
-            ax.text(label_x, label_y, action, 
-                   fontsize=7, bbox=dict(boxstyle='round,pad=0.3',
-                                       facecolor='lightblue', alpha=0.9,
-                                       edgecolor='#2196F3'),
-                   ha='center', va='bottom', fontweight='bold')
-            step_num += 1
-    
-    # Add legend
-    from matplotlib.patches import Patch
-    legend_elements = [
-        Patch(facecolor='#f44336', edgecolor='#c62828', label='Robot'),
-        Patch(facecolor='#4CAF50', edgecolor='#2d8659', label='Detected Object'),
-        Patch(facecolor='#FF9800', edgecolor='#F57C00', label='Manual Object'),
-        Patch(facecolor='yellow', edgecolor='orange', alpha=0.4, label='Scanned Area'),
-        Patch(facecolor='#2196F3', edgecolor='#1976D2', alpha=0.6, label='Picked Object'),
-    ]
-    ax.legend(handles=legend_elements, loc='upper right', fontsize=8)
+                        nearest_idx = idx
+                if nearest_idx is not None:
+                    self.pick(nearest_idx)
+
+class WarehouseFrame(namedtuple("WarehouseFrame", "robot path path_len path_extra scanned scanned_len "
+                                                  "scanned_extra objects picked picked_len picked_extra "
+                                                  "labels_len")):
+    """One frame of the warehouse view.
+
+    Paths, scans and picks only grow along a walk, so a frame keeps a
+    reference to its walk's lists and how much of them it shows, plus the
+    points its own last step added.
+    """
+
+    def robot_path(self):
+        return self.path[:self.path_len] + self.path_extra
+
+    def scanned_areas(self):
+        return self.scanned[:self.scanned_len] + self.scanned_extra
+
+    def picked_objects(self):
+        return self.picked[:self.picked_len] + self.picked_extra
+
+WarehouseTimeline = namedtuple("WarehouseTimeline", "frames labels")
+
+def build_warehouse_timeline(validation_data, manual_objects, grid_width=10, grid_height=8):
+    """Precompute every animation frame of a verification in one pass.
+
+    Frame k shows steps 0..k, where every step but the last could see the
+    action after it. Frames from the first pickobject on also start out
+    heading for the nearest manual object, so those come from a second
+    walk that starts with that target.
+    """
+    manual_objects = list(manual_objects)
+    n = len(validation_data)
+    actions = [item.get("action", "") for item in validation_data]
+
+    walks = [WarehouseWalk(manual_objects, grid_width, grid_height)]
+    first_pick = next((i for i, a in enumerate(actions) if a.lower() == "pickobject"), n)
+    if manual_objects and first_pick < n:
+        targeted = WarehouseWalk(manual_objects, grid_width, grid_height)
+        targeted.target = targeted.nearest_manual_object()
+        walks.append(targeted)
+
+    # Step labels stay where the robot would be after only the valid moveforwards
+    labels = []
+    label_counts = []
+    label_y = 1.0
+    for item, action in zip(validation_data, actions):
+        if item.get("result", "") == "valid":
+            if action == "moveforward":
+                label_y = min(label_y + 1.5, grid_height - 1.5)
+            labels.append((1.0, label_y, action))
+        label_counts.append(len(labels))
+
+    frames = []
+    for k, item in enumerate(validation_data):
+        walk = walks[-1] if k >= first_pick else walks[0]
+        last = walk.last_step(item)
+        frames.append(WarehouseFrame(
+            robot=(last.robot_x, last.robot_y),
+            path=walk.path, path_len=len(walk.path), path_extra=last.path,
+            scanned=walk.scanned, scanned_len=len(walk.scanned), scanned_extra=last.scanned,
+            objects=last.frozen_objects(),
+            picked=walk.picked, picked_len=len(walk.picked), picked_extra=last.picked,
+            labels_len=label_counts[k]))
+        next_action = actions[k + 1] if k + 1 < n else None
+        for w in walks:
+            w.step(item, next_action)
+    return WarehouseTimeline(frames, labels)
+
+def get_warehouse_timeline(validation_data):
+    """Timeline for validation_data and the current manual objects, cached."""
+    global warehouse_timeline
+    key = tuple(manual_objects)
+    if (warehouse_timeline is None or warehouse_timeline[0] is not validation_data
+            or warehouse_timeline[1] != key):
+        warehouse_timeline = (validation_data, key, build_warehouse_timeline(validation_data, key))
+    return warehouse_timeline[2]
+
+# Text is the slow part of a frame. Text hidden under a later one at the
+# same spot is skipped, and past these counts only the most recent texts
+# (or, for objects, no emoji at all) are drawn, so frames stay fast with
+# hundreds of objects or steps on screen
+MAX_OBJECT_GLYPHS = 30
+MAX_STEP_LABELS = 20
+MAX_MARKER_TEXTS = 20
+
+# Corners of an object box around its center
+OBJECT_BOX = np.array([[-0.3, -0.3], [0.3, -0.3], [0.3, 0.3], [-0.3, 0.3]])
+
+class TextPool:
+    """Reusable text artists: update() moves, relabels and hides them."""
+
+    def __init__(self, ax, **style):
+        self.ax = ax
+        self.style = style
+        self.texts = []
+
+    def update(self, items):
+        """Show one text per (x, y, text) item and hide the rest."""
+        while len(self.texts) < len(items):
+            self.texts.append(self.ax.text(0, 0, '', animated=True, **self.style))
+        for text, (x, y, s) in zip(self.texts, items):
+            text.set_position((x, y))
+            text.set_text(s)
+            text.set_visible(True)
+        for text in self.texts[len(items):]:
+            text.set_visible(False)
+
+    def artists(self):
+        return [text for text in self.texts if text.get_visible()]
+
+def topmost(items):
+    """Keep only the last (x, y, ...) item at each position; the others are drawn over."""
+    last = {}
+    for item in items:
+        last.pop((item[0], item[1]), None)
+        last[(item[0], item[1])] = item
+    return list(last.values())
+
+def circle_collection(ax, radius, **style):
+    """Circles of a fixed radius in data units, placed with set_offsets()."""
+    collection = EllipseCollection([2 * radius], [2 * radius], [0], units='xy',
+                                   offsets=np.empty((0, 2)), offset_transform=ax.transData,
+                                   animated=True, **style)
+    ax.add_collection(collection, autolim=False)
+    return collection
+
+def set_points(collection, points):
+    """Move a collection's items to points, hiding it if there are none."""
+    collection.set_visible(len(points) > 0)
+    if points:
+        collection.set_offsets(np.asarray(points, dtype=float))
+
+class WarehouseView:
+    """Warehouse plot that keeps its artists and redraws by blitting.
+
+    The floor, grid, shelves and legend are drawn once and cached as a
+    background image. The robot, path, objects and markers are animated
+    artists that show() moves or hides, then draws over that background.
+    Zooming, panning and resizing redraw the background through the
+    canvas's draw_event.
+    """
+
+    def __init__(self, ax, canvas, grid_width=10, grid_height=8):
+        self.ax = ax
+        self.canvas = canvas
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.layout = None
+        self.background = None
+        canvas.mpl_connect('draw_event', self.on_draw)
+
+    def build(self, layout, legend_elements, title, xlabel=None):
+        """Draw the static part of the plot and create the animated artists."""
+        ax = self.ax
+        ax.clear()
+        self.layout = layout
+        self.background = None
+        draw_warehouse_base(ax, self.grid_width, self.grid_height)
+        self.legend = ax.legend(handles=legend_elements, loc='upper right', fontsize=8)
+        if xlabel:
+            ax.set_xlabel(xlabel, fontsize=10)
+        ax.grid(True, alpha=0.3)
+        ax.set_title(title, fontsize=14, fontweight='bold', pad=15)
+
+        # Start position marker
+        start_mark = Circle((1.0, 1.0), 0.15, facecolor='#4CAF50', edgecolor='#2d8659', linewidth=2)
+        ax.add_patch(start_mark)
+        ax.text(1.0, 0.4, 'START', ha='center', va='top', fontsize=8,
+                fontweight='bold', color='#2d8659')
+
+        # Animated artists, in drawing order
+        self.scans = circle_collection(ax, 0.4, facecolor='yellow', edgecolor='orange',
+                                       linewidth=2, alpha=0.4)
+        self.scan_texts = TextPool(ax, ha='center', va='center', fontsize=7,
+                                   fontweight='bold', color='darkorange')
+        self.objects = PolyCollection([], linewidth=2, animated=True)
+        ax.add_collection(self.objects, autolim=False)
+        self.object_glyphs = TextPool(ax, ha='center', va='center', fontsize=12)
+        self.picks = circle_collection(ax, 0.2, facecolor='#2196F3', edgecolor='#1976D2',
+                                       linewidth=2, alpha=0.6)
+        self.pick_texts = TextPool(ax, ha='center', va='center', fontsize=10,
+                                   fontweight='bold', color='white')
+        self.path, = ax.plot([], [], 'b--', linewidth=2, alpha=0.5, animated=True)
+        self.robot = Circle((1.0, 1.0), 0.35, facecolor='#f44336', edgecolor='#c62828',
+                            linewidth=3, animated=True)
+        ax.add_patch(self.robot)
+        self.robot_glyph = ax.text(1.0, 1.0, '🤖', ha='center', va='center', fontsize=14,
+                                   animated=True)
+        self.steps = circle_collection(ax, 0.25, facecolor='white', edgecolor='#2196F3',
+                                       linewidth=2)
+        self.step_numbers = TextPool(ax, ha='center', va='center', fontsize=8,
+                                     fontweight='bold', color='#2196F3')
+        self.step_actions = TextPool(ax, fontsize=7, ha='center', va='bottom', fontweight='bold',
+                                     bbox=dict(boxstyle='round,pad=0.3', facecolor='lightblue',
+                                               alpha=0.9, edgecolor='#2196F3'))
+        # Step counter; the title itself is static so it isn't redrawn each frame
+        self.status = ax.text(0.01, 0.98, '', transform=ax.transAxes, ha='left', va='top',
+                              fontsize=10, fontweight='bold', animated=True)
+
+    def animated_artists(self):
+        return ([self.scans] + self.scan_texts.artists()
+                + [self.objects] + self.object_glyphs.artists()
+                + [self.picks] + self.pick_texts.artists()
+                + [self.path, self.robot, self.robot_glyph]
+                + [self.steps] + self.step_numbers.artists() + self.step_actions.artists()
+                + [self.status])
+
+    def on_draw(self, event):
+        """Cache the freshly drawn background and put the animated artists on it."""
+        if self.layout is None:
+            return
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        # The legend goes back on top of the animated artists as pixels,
+        # which is much cheaper than drawing it again
+        self.legend_image = self.canvas.copy_from_bbox(self.legend.get_window_extent().padded(2))
+        self.draw_animated()
+
+    def draw_animated(self):
+        for artist in self.animated_artists():
+            if artist.get_visible():
+                self.ax.draw_artist(artist)
+        self.canvas.restore_region(self.legend_image)
+
+    def show(self, robot, robot_path, objects, scanned_areas, picked_objects, labels, status=''):
+        """Move the animated artists to a new frame and blit it."""
+        set_points(self.scans, scanned_areas)
+        self.scan_texts.update(topmost([(sx, sy, 'SCAN') for sx, sy in scanned_areas])[-MAX_MARKER_TEXTS:])
+
+        # Manual objects are orange, detected objects are green
+        self.objects.set_visible(bool(objects))
+        if objects:
+            centers = np.array([(obj[0], obj[1]) for obj in objects], dtype=float)
+            self.objects.set_verts(centers[:, None, :] + OBJECT_BOX)
+            manual = [obj[2] == "manual" for obj in objects]
+            self.objects.set_facecolor(['#FF9800' if m else '#4CAF50' for m in manual])
+            self.objects.set_edgecolor(['#F57C00' if m else '#2d8659' for m in manual])
+        glyphs = objects if len(objects) <= MAX_OBJECT_GLYPHS else []
+        self.object_glyphs.update([(obj[0], obj[1], '📦') for obj in glyphs])
+
+        set_points(self.picks, picked_objects)
+        self.pick_texts.update(topmost([(px, py, '✓') for px, py in picked_objects])[-MAX_MARKER_TEXTS:])
+
+        self.path.set_visible(len(robot_path) > 1)
+        self.path.set_data([p[0] for p in robot_path], [p[1] for p in robot_path])
+        self.robot.set_center(robot)
+        self.robot_glyph.set_position(robot)
+
+        set_points(self.steps, [(x, y) for x, y, action in labels])
+        numbers = [(x, y, str(step_num)) for step_num, (x, y, action) in enumerate(labels, start=1)]
+        self.step_numbers.update(topmost(numbers)[-MAX_STEP_LABELS:])
+        # Place labels offset from path to avoid overlap
+        actions = [(x + (0.4 if step_num % 2 == 0 else -0.4), y + 0.4, action)
+                   for step_num, (x, y, action) in enumerate(labels, start=1)]
+        self.step_actions.update(topmost(actions)[-MAX_STEP_LABELS:])
+
+        self.status.set_text(status)
+        self.blit()
+
+    def blit(self):
+        if self.background is None:
+            self.canvas.draw()  # on_draw() caches the background
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_animated()
+        self.canvas.blit(self.canvas.figure.bbox)
+
+def get_warehouse_view(ax, canvas):
+    """The WarehouseView drawing on ax, created on first use."""
+    global warehouse_view
+    if warehouse_view is None or warehouse_view.ax is not ax:
+        warehouse_view = WarehouseView(ax, canvas)
+    return warehouse_view
+
+def visualize_warehouse_frame(validation_data, ax, canvas, frame_step=None):
+    """Visualize robot movement in a warehouse floor plan - single frame."""
+    if not validation_data:
+        return
     
-    title_text = "Warehouse Robot Movement Visualization"
-    if frame_step is not None:
-        title_text += f" - Step {frame_step + 1}/{len(validation_data)}"
-    ax.set_title(title_text, fontsize=14, fontweight='bold', pad=15)
-    ax.set_xlabel("Warehouse Floor Plan", fontsize=10)
-    ax.grid(True, alpha=0.3)
-    canvas.draw()
+    view = get_warehouse_view(ax, canvas)
+    if view.layout != "animation":
+        from matplotlib.patches import Patch
+        legend_elements = [
+            Patch(facecolor='#f44336', edgecolor='#c62828', label='Robot'),
+            Patch(facecolor='#4CAF50', edgecolor='#2d8659', label='Detected Object'),
+            Patch(facecolor='#FF9800', edgecolor='#F57C00', label='Manual Object'),
+            Patch(facecolor='yellow', edgecolor='orange', alpha=0.4, label='Scanned Area'),
+            Patch(facecolor='#2196F3', edgecolor='#1976D2', alpha=0.6, label='Picked Object'),
+        ]
+        view.build("animation", legend_elements, "Warehouse Robot Movement Visualization",
+                   xlabel="Warehouse Floor Plan")
+    
+    # Look the frame up in the timeline, computed once per verification
+    timeline = get_warehouse_timeline(validation_data)
+    last_step = len(validation_data) - 1 if frame_step is None else min(frame_step, len(validation_data) - 1)
+    frame = timeline.frames[last_step]
+    
+    status = "" if frame_step is None else f"Step {frame_step + 1}/{len(validation_data)}"
+    view.show(frame.robot, frame.robot_path(), frame.objects, frame.scanned_areas(),
+              frame.picked_objects(), timeline.labels[:frame.labels_len], status)
 
 def visualize_warehouse(validation_data, fsm_data, ax, canvas):
     """Visualize robot movement in a warehouse floor plan - full view."""
@@ -576,136 +813,317 @@ def visualize_warehouse(validation_data, fsm_data, ax, canvas):
     ax.grid(True, alpha=0.3)
     canvas.draw()
 
+def show_animation_frame(step):
+    """Show one animation frame and move the scrub slider to it."""
+    global current_animation_step
+    current_animation_step = step
+    visualize_warehouse_frame(animation_data, fsm_ax, fsm_canvas, step)
+    if 'scrub_slider' in globals():
+        scrub_slider.set(step + 1)
+
+def seek_animation(step):
+    """Jump to a step; playback, if running, carries on from there."""
+    global animation_clock
+    show_animation_frame(step)
+    if is_animating:
+        animation_clock = (time.perf_counter(), step)
+
 def animate_step():
     """Animate one step forward."""
-    global current_animation_step, animation_data
     if animation_data and current_animation_step < len(animation_data) - 1:
-        current_animation_step += 1
-        visualize_warehouse_frame(animation_data, fsm_ax, fsm_canvas, current_animation_step)
+        seek_animation(current_animation_step + 1)
 
 def animate_back():
     """Animate one step backward."""
-    global current_animation_step, animation_data
     if animation_data and current_animation_step > 0:
-        current_animation_step -= 1
-        visualize_warehouse_frame(animation_data, fsm_ax, fsm_canvas, current_animation_step)
+        seek_animation(current_animation_step - 1)
 
 def reset_animation():
     """Reset animation to start."""
-    global current_animation_step, is_animating
+    global current_animation_step
+    stop_animation()
     current_animation_step = 0
-    is_animating = False
     if animation_data:
-        visualize_warehouse_frame(animation_data, fsm_ax, fsm_canvas, 0)
+        show_animation_frame(0)
+
+def start_animation():
+    """Play from the current step (from the start if at the end)."""
+    global is_animating, animation_clock, animation_job
+    if animation_data and current_animation_step >= len(animation_data) - 1:
+        show_animation_frame(0)
+    is_animating = True
+    animation_clock = (time.perf_counter(), current_animation_step)
+    if 'play_btn' in globals():
+        play_btn.config(text="⏸ Pause")
+    animation_job = root.after(int(1000 / animation_speed), animation_tick)
+
+def stop_animation():
+    """Pause playback."""
+    global is_animating, animation_job
+    is_animating = False
+    if animation_job is not None:
+        root.after_cancel(animation_job)
+        animation_job = None
     if 'play_btn' in globals():
         play_btn.config(text="▶ Play")
 
+def animation_tick():
+    """Show the step playback should be at now and schedule the next one."""
+    global animation_job
+    animation_job = None
+    if not is_animating or not animation_data:
+        return
+    start_time, start_step = animation_clock
+    last_step = len(animation_data) - 1
+    step = min(start_step + int((time.perf_counter() - start_time) * animation_speed), last_step)
+    if step != current_animation_step:
+        show_animation_frame(step)
+    if step >= last_step:
+        stop_animation()
+        return
+    # Wake up when the next step is due, however long this frame took
+    next_due = start_time + (step - start_step + 1) / animation_speed
+    delay = max(1, int((next_due - time.perf_counter()) * 1000))
+    animation_job = root.after(delay, animation_tick)
+
 def toggle_animation():
     """Toggle animation play/pause."""
-    global is_animating, animation_thread, animation_data, current_animation_step
-    
     if not animation_data:
         return
-    
     if is_animating:
-        # Pause
-        is_animating = False
-        play_btn.config(text="▶ Play")
+        stop_animation()
     else:
-        # Play
-        is_animating = True
-        play_btn.config(text="⏸ Pause")
-        
-        def animation_loop():
-            global current_animation_step, is_animating
-            while is_animating and current_animation_step < len(animation_data) - 1:
-                current_animation_step += 1
-                step = current_animation_step
-                root.after(0, lambda s=step: visualize_warehouse_frame(animation_data, fsm_ax, fsm_canvas, s))
-                time.sleep(1.0)  # 1 second per step
-            is_animating = False
-            root.after(0, lambda: play_btn.config(text="▶ Play"))
-        
-        animation_thread = threading.Thread(target=animation_loop, daemon=True)
-        animation_thread.start()
+        start_animation()
 
-def visualize_fsm(fsm_data, ax, canvas):
-    """Visualize FSM using matplotlib and networkx (fallback option)."""
-    if not fsm_data or "nodes" not in fsm_data or "edges" not in fsm_data:
+def on_speed_change(event=None):
+    """Apply the speed picked in the speed box."""
+    global animation_speed, animation_clock
+    try:
+        speed = float(speed_picker.get())
+    except ValueError:
         return
-    
-    # Clear previous plot
-    ax.clear()
-    
-    # Create directed graph
-    G = nx.DiGraph()
-    
-    # Add nodes
+    if speed > 0:
+        animation_speed = speed
+        if is_animating:
+            animation_clock = (time.perf_counter(), current_animation_step)
+
+def on_scrub(value):
+    """Slider moved: show that step. Fast drags collapse into one redraw."""
+    global scrub_target, scrub_job
+    if not animation_data:
+        return
+    step = min(int(float(value)), len(animation_data)) - 1
+    if step == current_animation_step and scrub_job is None:
+        # Tk reports the player's own slider moves later, at idle time
+        return
+    scrub_target = step
+    if scrub_job is None:
+        scrub_job = root.after_idle(apply_scrub)
+
+def apply_scrub():
+    global scrub_job
+    scrub_job = None
+    if animation_data and scrub_target != current_animation_step:
+        seek_animation(scrub_target)
+
+# FSM view. Past these many nodes/edges in view, labels get shorter or are
+# left out, so big graphs stay quick to draw, pan and zoom.
+FSM_FULL_LABELS = 12   # "S3" and its conditions
+FSM_SHORT_LABELS = 150  # "S3"
+FSM_EDGE_LABELS = 40
+FSM_ARROWS = 500  # More edges than this are drawn as plain lines
+
+FSMLayout = namedtuple("FSMLayout", "positions node_colors labels short_labels "
+                                    "edge_starts edge_ends edge_colors edge_labels loops")
+
+def layered_fsm_layout(fsm_data):
+    """Lay an FSM out in layers by distance from its first state, in O(V + E).
+
+    Layers are columns left to right; within one, states keep the order
+    they were first reached in. Parallel edges are merged into one with
+    all their actions as its label.
+    """
+    nodes = fsm_data["nodes"]
+    index = {node["id"]: i for i, node in enumerate(nodes)}
+
+    adjacency = [[] for _ in nodes]
+    merged = {}  # (from, to) -> [actions, all valid]
+    for edge in fsm_data["edges"]:
+        a = index.get(edge["from"])
+        b = index.get(edge["to"])
+        if a is None or b is None:
+            continue
+        if (a, b) not in merged:
+            merged[(a, b)] = [[], True]
+            adjacency[a].append(b)
+        entry = merged[(a, b)]
+        if edge["label"] not in entry[0]:
+            entry[0].append(edge["label"])
+        entry[1] = entry[1] and edge.get("valid", True)
+
+    # Breadth-first layers, starting again at any state not reached yet
+    layer = [None] * len(nodes)
+    for root_index in range(len(nodes)):
+        if layer[root_index] is not None:
+            continue
+        layer[root_index] = 0
+        frontier = [root_index]
+        while frontier:
+            following = []
+            for a in frontier:
+                for b in adjacency[a]:
+                    if layer[b] is None:
+                        layer[b] = layer[a] + 1
+                        following.append(b)
+            frontier = following
+
+    columns = {}
+    for i in range(len(nodes)):
+        columns.setdefault(layer[i], []).append(i)
+    positions = np.zeros((len(nodes), 2))
+    for x, members in columns.items():
+        for row, i in enumerate(members):
+            positions[i] = (x, (len(members) - 1) / 2 - row)
+
     node_colors = []
-    node_labels = {}
-    
-    for node in fsm_data["nodes"]:
-        node_id = node["id"]
-        label = node["label"]
+    for node in nodes:
         node_type = node.get("type", "valid")
-        
-        G.add_node(node_id)
-        node_labels[node_id] = label
-        
-        # Color based on type
         if node_type == "initial":
             node_colors.append("#4CAF50")  # Green
         elif node_type == "valid":
             node_colors.append("#2196F3")  # Blue
         else:
             node_colors.append("#f44336")  # Red
-    
-    # Add edges
-    edge_colors = []
-    edge_labels = {}
-    
-    for edge in fsm_data["edges"]:
-        from_node = edge["from"]
-        to_node = edge["to"]
-        action = edge["label"]
-        is_valid = edge.get("valid", True)
-        
-        G.add_edge(from_node, to_node)
-        edge_labels[(from_node, to_node)] = action
-        
-        # Color based on validity
-        if is_valid:
-            edge_colors.append("#2d8659")  # Green
+
+    pairs = [pair for pair in merged if pair[0] != pair[1]]
+    loops = sorted({a for a, b in merged if a == b})
+    return FSMLayout(
+        positions=positions,
+        node_colors=node_colors,
+        labels=[node["label"] for node in nodes],
+        short_labels=[node["label"].split(":")[0] for node in nodes],
+        edge_starts=positions[[a for a, b in pairs]].reshape(-1, 2),
+        edge_ends=positions[[b for a, b in pairs]].reshape(-1, 2),
+        edge_colors=["#2d8659" if merged[pair][1] else "#dc2626" for pair in pairs],
+        edge_labels=[", ".join(merged[pair][0]) for pair in pairs],
+        loops=loops)
+
+def get_fsm_layout(fsm_data):
+    """Layout for fsm_data, cached for the current response."""
+    global fsm_layout
+    if fsm_layout is None or fsm_layout[0] is not fsm_data:
+        fsm_layout = (fsm_data, layered_fsm_layout(fsm_data))
+    return fsm_layout[1]
+
+class FSMLabels:
+    """Node and edge labels for what is in view, redone on zoom and pan."""
+
+    def __init__(self, ax, layout, node_size):
+        self.ax = ax
+        self.layout = layout
+        self.node_radius = node_size ** 0.5 / 2  # points
+        self.texts = []
+        self.shown = None
+        self.midpoints = (layout.edge_starts + layout.edge_ends) / 2
+
+    def update(self, ax=None):
+        (x0, x1), (y0, y1) = sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+        positions = self.layout.positions
+        in_view = np.flatnonzero((positions[:, 0] >= x0) & (positions[:, 0] <= x1)
+                                 & (positions[:, 1] >= y0) & (positions[:, 1] <= y1))
+        mids = self.midpoints
+        edges_in_view = np.flatnonzero((mids[:, 0] >= x0) & (mids[:, 0] <= x1)
+                                       & (mids[:, 1] >= y0) & (mids[:, 1] <= y1))
+        if len(in_view) <= FSM_FULL_LABELS:
+            node_labels = self.layout.labels
+        elif len(in_view) <= FSM_SHORT_LABELS:
+            node_labels = self.layout.short_labels
         else:
-            edge_colors.append("#dc2626")  # Red
-    
-    # Use hierarchical layout for better visualization
-    try:
-        pos = nx.spring_layout(G, k=2, iterations=50, seed=42)
-    except:
-        pos = nx.circular_layout(G)
-    
-    # Draw nodes
-    nx.draw_networkx_nodes(G, pos, ax=ax, node_color=node_colors, 
-                           node_size=2000, alpha=0.9, node_shape='o')
-    
-    # Draw edges
-    nx.draw_networkx_edges(G, pos, ax=ax, edge_color=edge_colors, 
-                          arrows=True, arrowsize=20, width=2, alpha=0.6,
-                          arrowstyle='->', connectionstyle='arc3,rad=0.1')
-    
-    # Draw labels
-    nx.draw_networkx_labels(G, pos, ax=ax, labels=node_labels, 
-                           font_size=8, font_weight='bold')
-    
-    # Draw edge labels
-    nx.draw_networkx_edge_labels(G, pos, ax=ax, edge_labels=edge_labels,
-                                 font_size=7, bbox=dict(boxstyle='round,pad=0.3',
-                                                       facecolor='white', alpha=0.7))
+            node_labels = None
+        if len(edges_in_view) > FSM_EDGE_LABELS:
+            edges_in_view = edges_in_view[:0]
+        shown = (node_labels is self.layout.labels, node_labels is None,
+                 tuple(in_view), tuple(edges_in_view))
+        if shown == self.shown:
+            return
+        self.shown = shown
+
+        for text in self.texts:
+            text.remove()
+        self.texts = []
+        if node_labels is self.layout.labels:
+            # Full labels under the node, one condition per line
+            for i in in_view:
+                text = node_labels[i].split(": ", 1)[-1].replace(", ", "\n")
+                self.texts.append(self.ax.annotate(text, positions[i], xytext=(0, -self.node_radius - 2),
+                                                   textcoords='offset points', ha='center', va='top',
+                                                   fontsize=7))
+        if node_labels is not None:
+            for i in in_view:
+                x, y = positions[i]
+                self.texts.append(self.ax.text(x, y, self.layout.short_labels[i], ha='center',
+                                               va='center', fontsize=8, fontweight='bold'))
+        # Edge labels just above the edge's midpoint
+        for e in edges_in_view:
+            self.texts.append(self.ax.annotate(self.layout.edge_labels[e], mids[e], xytext=(0, 4),
+                                               textcoords='offset points', ha='center', va='bottom',
+                                               fontsize=7, bbox=dict(boxstyle='round,pad=0.3',
+                                                                     facecolor='white', alpha=0.7)))
+
+def visualize_fsm(fsm_data, ax, canvas):
+    """Visualize an FSM as layered columns of states, drawn as collections."""
+    if not fsm_data or "nodes" not in fsm_data or "edges" not in fsm_data:
+        return
     
+    # Clear previous plot
+    ax.clear()
+    if not fsm_data["nodes"]:
+        canvas.draw_idle()
+        return
+    layout = get_fsm_layout(fsm_data)
+    positions = layout.positions
+    
+    # Node size shrinks as the graph grows
+    node_size = max(60, min(2000, 40000 / len(positions)))
+    
+    # All edges as one collection: arrows, or for big graphs plain lines
+    # without antialiasing, which Agg fills much faster
+    edge_count = len(layout.edge_starts)
+    if 0 < edge_count <= FSM_ARROWS:
+        # Stop short of the nodes so the arrowheads show
+        deltas = layout.edge_ends - layout.edge_starts
+        lengths = np.hypot(deltas[:, 0], deltas[:, 1])[:, None]
+        trim = np.minimum(0.3, 0.4 * lengths) / lengths
+        starts = layout.edge_starts + deltas * trim
+        deltas = deltas * (1 - 2 * trim)
+        ax.quiver(starts[:, 0], starts[:, 1], deltas[:, 0], deltas[:, 1],
+                  color=layout.edge_colors, angles='xy', scale_units='xy', scale=1,
+                  width=0.002, headwidth=6, headlength=8, alpha=0.6, zorder=1)
+    elif edge_count:
+        segments = np.stack([layout.edge_starts, layout.edge_ends], axis=1)
+        ax.add_collection(LineCollection(segments, colors=layout.edge_colors, linewidths=0.5,
+                                         alpha=0.4, antialiaseds=False, zorder=1))
+    
+    # All nodes as one scatter; states with a self-loop get a ring
+    ax.scatter(positions[:, 0], positions[:, 1], s=node_size, c=layout.node_colors,
+               alpha=0.9, zorder=2)
+    if layout.loops:
+        ax.scatter(positions[layout.loops, 0], positions[layout.loops, 1], s=node_size * 1.6,
+                   facecolors='none', edgecolors='#2d8659', linewidths=1.5, zorder=2)
+    
+    ax.set_xlim(positions[:, 0].min() - 0.6, positions[:, 0].max() + 0.6)
+    ax.set_ylim(positions[:, 1].min() - 0.6, positions[:, 1].max() + 0.6)
     ax.set_title("Finite State Machine Visualization", fontsize=12, fontweight='bold', pad=10)
     ax.axis('off')
-    canvas.draw()
+    
+    # Labels follow the view (ax.clear() dropped the old callbacks)
+    # and are kept in a global since the callbacks only hold weak references
+    global fsm_labels
+    fsm_labels = FSMLabels(ax, layout, node_size)
+    fsm_labels.update()
+    ax.callbacks.connect('xlim_changed', fsm_labels.update)
+    ax.callbacks.connect('ylim_changed', fsm_labels.update)
+    canvas.draw_idle()
 
 def add_action():
     """Add selected action from dropdown to sequence."""
@@ -861,119 +1279,104 @@ def send_sequence():
         messagebox.showwarning("Warning", "Please add at least one action.")
         return
 
+    global verify_request, verify_counter
+    if verify_request is not None:
+        return
+
+    # Send manual objects to backend so it can calculate movement. Both
+    # lists are copied so the sequence can be edited while this runs.
+    request_data = {
+        "actions": actions,
+        "manual_objects": list(manual_objects)  # Send manual object positions
+    }
+    verify_counter += 1
+    cancel = threading.Event()
+    worker = threading.Thread(target=verification_worker,
+                              args=(verify_counter, request_data, cancel), daemon=True)
+    verify_request = (verify_counter, cancel, worker)
+    worker.start()
+
+    btn.config(state='disabled')
+    cancel_btn.config(state='normal')
+    verify_progress.config(mode='indeterminate', value=0)
+    verify_progress.start(15)
+    verify_status.config(text=f"Verifying {len(actions)} action(s)...")
+    root.after(POLL_INTERVAL_MS, poll_verification)
+
+def verification_worker(request_id, request_data, cancel):
+    """Send one verification request; runs on a worker thread.
+
+    Never touches Tk: progress, the decoded response or the exception goes
+    on verify_results. Stops reading as soon as `cancel` is set, and
+    cancel_verification() breaks the connection if it is still waiting.
+    """
+    if cancel.is_set():
+        return
     try:
-        # Send manual objects to backend so it can calculate movement
-        request_data = {
-            "actions": actions,
-            "manual_objects": manual_objects  # Send manual object positions
-        }
-        response = requests.post(API_URL, json=request_data)
-        data = response.json()
-
-        # Clear table first
-        for row in table.get_children():
-            table.delete(row)
-
-        # Clear explanation area
-        explanation_text.config(state=tk.NORMAL)
-        explanation_text.delete("1.0", tk.END)
-        explanation_text.config(state=tk.DISABLED)
+        with http_session.post(API_URL, json=request_data, timeout=REQUEST_TIMEOUT,
+                               stream=True) as response:
+            total = int(response.headers.get("Content-Length") or 0)
+            chunks = []
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                if cancel.is_set():
+                    return  # closes the connection, so the server can stop too
+                chunks.append(chunk)
+                if total:
+                    verify_results.put((request_id, "progress", response.raw.tell() / total))
+            data = json.loads(b"".join(chunks))
+    except Exception as e:
+        if not cancel.is_set():
+            verify_results.put((request_id, "error", e))
+    else:
+        verify_results.put((request_id, "done", data))
 
-        # Fill table with enhanced information
-        for i, item in enumerate(data["validation"]):
-            result = item["result"]
-            status = "✓ Valid" if result == "valid" else "✗ Invalid"
-            
-            # Determine color based on result
-            if result == "valid":
-                color = "valid"
-            elif result == "precondition_failed":
-                color = "warning"
+def poll_verification():
+    """Pick up results from verification_worker() on the Tk main loop."""
+    try:
+        while True:
+            request_id, kind, value = verify_results.get_nowait()
+            if verify_request is None or request_id != verify_request[0]:
+                continue  # Cancelled request, drop it
+            if kind == "progress":
+                # Response is arriving: switch to a real progress bar
+                verify_progress.stop()
+                verify_progress.config(mode='determinate', value=min(value, 1.0) * 100)
+                verify_status.config(text="Receiving results...")
             else:
-                color = "error"
-            
-            # Get precondition status
-            precondition = item.get("precondition", "N/A")
-            prec_status = "✓" if item.get("precondition_met", False) else "✗"
-            
-            table.insert("", "end", values=(
-                i+1, 
-                item["action"], 
-                precondition,
-                prec_status,
-                status
-            ), tags=(color,))
-
-        # Configure tag colors
-        table.tag_configure("valid", foreground="#2d8659", background="#e8f5e9")
-        table.tag_configure("warning", foreground="#d97706", background="#fff7ed")
-        table.tag_configure("error", foreground="#dc2626", background="#fee2e2")
-
-        # Update explanation when row is selected
-        def on_select(event):
-            selection = table.selection()
-            if selection:
-                item = table.item(selection[0])
-                index = int(item['values'][0]) - 1
-                if 0 <= index < len(data["validation"]):
-                    explanation = data["validation"][index].get("explanation", "No explanation available.")
-                    explanation_text.config(state=tk.NORMAL)
-                    explanation_text.delete("1.0", tk.END)
-                    explanation_text.insert("1.0", f"Step {index + 1}: {explanation}")
-                    explanation_text.config(state=tk.DISABLED)
-
-        table.bind("<<TreeviewSelect>>", on_select)
-
-        # Show first item's explanation by default
-        if data["validation"]:
-            explanation_text.config(state=tk.NORMAL)
-            explanation_text.insert("1.0", f"Step 1: {data['validation'][0].get('explanation', 'No explanation available.')}")
-            explanation_text.config(state=tk.DISABLED)
-            # Select first row
-            first_item = table.get_children()[0]
-            table.selection_set(first_item)
-            table.focus(first_item)
-
-        # Update summary
-        summary_text = data.get("summary", "")
-        summary_details = data.get("summary_details", "")
-        summary_label.config(
-            text=f"{summary_text}\n{summary_details}",
-            fg="#2d8659" if "VALID" in summary_text else "#dc2626"
-        )
-        
-        # Update final state
-        final_state = data.get("final_state", [])
-        if final_state:
-            final_state_label.config(
-                text="Final world state: " + ", ".join(final_state)
-            )
-        else:
-            final_state_label.config(text="Final world state: (none)")
-        
-        # Update battery
-        final_batt = data.get("final_battery", None)
-        if final_batt is not None:
-            battery_label.config(text=f"Battery: {final_batt}%")
-        else:
-            battery_label.config(text="Battery: N/A")
-        
-        # Visualize warehouse movement if data is available
-        if "fsm" in data and "validation" in data:
-            global animation_data, current_animation_step, is_animating
-            animation_data = data["validation"]
-            current_animation_step = 0
-            is_animating = False
-            visualize_warehouse_frame(animation_data, fsm_ax, fsm_canvas, 0)
-            update_obj_count()
-            # Enable animation controls
-            if 'play_btn' in globals():
-                play_btn.config(state='normal')
-                step_forward_btn.config(state='normal')
-                step_back_btn.config(state='normal')
-                reset_btn.config(state='normal')
-
-    except requests.exceptions.ConnectionError:
+                finish_verification()
+                if kind == "done":
+                    show_verification(value)
+                else:
+                    show_request_error(value)
+    except queue.Empty:
+        pass
+    if verify_request is not None:
+        root.after(POLL_INTERVAL_MS, poll_verification)
+
+def cancel_verification():
+    """Abandon the running verification request."""
+    if verify_request is None:
+        return
+    _, cancel, worker = verify_request
+    cancel.set()
+    # Unblocks the worker even before the response headers have arrived
+    http_adapter.abort(worker.ident)
+    finish_verification()
+    verify_status.config(text="Verification cancelled.")
+
+def finish_verification():
+    """Return the verify controls to idle."""
+    global verify_request
+    verify_request = None
+    verify_progress.stop()
+    verify_progress.config(mode='determinate', value=0)
+    verify_status.config(text="")
+    btn.config(state='normal')
+    cancel_btn.config(state='disabled')
+
+def show_request_error(error):
+    """Report a failed verification request."""
+    if isinstance(error, requests.exceptions.ConnectionError):
         messagebox.showerror(
             "Connection Error",
             "Cannot connect to backend server.\n\n"
@@ -984,8 +1387,120 @@ def send_sequence():
             "To start the backend, run:\n"
             "python app.py"
         )
-    except Exception as e:
-        messagebox.showerror("Error", f"Could not connect to backend:\n{e}")
+    elif isinstance(error, requests.exceptions.Timeout):
+        messagebox.showerror("Timeout", f"The backend did not answer within {REQUEST_TIMEOUT[1]} seconds.")
+    else:
+        messagebox.showerror("Error", f"Could not connect to backend:\n{error}")
+
+def show_verification(data):
+    """Fill the results table, summary and warehouse view from a response."""
+    if "validation" not in data:
+        messagebox.showerror("Error", f"Verification failed:\n{data.get('error', data)}")
+        return
+
+    # Clear table first
+    for row in table.get_children():
+        table.delete(row)
+
+    # Clear explanation area
+    explanation_text.config(state=tk.NORMAL)
+    explanation_text.delete("1.0", tk.END)
+    explanation_text.config(state=tk.DISABLED)
+
+    # Fill table with enhanced information
+    for i, item in enumerate(data["validation"]):
+        result = item["result"]
+        status = "✓ Valid" if result == "valid" else "✗ Invalid"
+
+        # Determine color based on result
+        if result == "valid":
+            color = "valid"
+        elif result == "precondition_failed":
+            color = "warning"
+        else:
+            color = "error"
+
+        # Get precondition status
+        precondition = item.get("precondition", "N/A")
+        prec_status = "✓" if item.get("precondition_met", False) else "✗"
+
+        table.insert("", "end", values=(
+            i+1, 
+            item["action"], 
+            precondition,
+            prec_status,
+            status
+        ), tags=(color,))
+
+    # Configure tag colors
+    table.tag_configure("valid", foreground="#2d8659", background="#e8f5e9")
+    table.tag_configure("warning", foreground="#d97706", background="#fff7ed")
+    table.tag_configure("error", foreground="#dc2626", background="#fee2e2")
+
+    # Update explanation when row is selected
+    def on_select(event):
+        selection = table.selection()
+        if selection:
+            item = table.item(selection[0])
+            index = int(item['values'][0]) - 1
+            if 0 <= index < len(data["validation"]):
+                explanation = data["validation"][index].get("explanation", "No explanation available.")
+                explanation_text.config(state=tk.NORMAL)
+                explanation_text.delete("1.0", tk.END)
+                explanation_text.insert("1.0", f"Step {index + 1}: {explanation}")
+                explanation_text.config(state=tk.DISABLED)
+
+    table.bind("<<TreeviewSelect>>", on_select)
+
+    # Show first item's explanation by default
+    if data["validation"]:
+        explanation_text.config(state=tk.NORMAL)
+        explanation_text.insert("1.0", f"Step 1: {data['validation'][0].get('explanation', 'No explanation available.')}")
+        explanation_text.config(state=tk.DISABLED)
+        # Select first row
+        first_item = table.get_children()[0]
+        table.selection_set(first_item)
+        table.focus(first_item)
+
+    # Update summary
+    summary_text = data.get("summary", "")
+    summary_details = data.get("summary_details", "")
+    summary_label.config(
+        text=f"{summary_text}\n{summary_details}",
+        fg="#2d8659" if "VALID" in summary_text else "#dc2626"
+    )
+
+    # Update final state
+    final_state = data.get("final_state", [])
+    if final_state:
+        final_state_label.config(
+            text="Final world state: " + ", ".join(final_state)
+        )
+    else:
+        final_state_label.config(text="Final world state: (none)")
+
+    # Update battery
+    final_batt = data.get("final_battery", None)
+    if final_batt is not None:
+        battery_label.config(text=f"Battery: {final_batt}%")
+    else:
+        battery_label.config(text="Battery: N/A")
+
+    # Visualize warehouse movement if data is available
+    if "fsm" in data and "validation" in data:
+        global animation_data
+        stop_animation()
+        animation_data = data["validation"]
+        scrub_slider.config(to=max(len(animation_data), 1), state='normal')
+        show_animation_frame(0)
+        update_obj_count()
+        visualize_fsm(data["fsm"], fsm_graph_ax, fsm_graph_canvas)
+        # Enable animation controls
+        if 'play_btn' in globals():
+            play_btn.config(state='normal')
+            step_forward_btn.config(state='normal')
+            step_back_btn.config(state='normal')
+            reset_btn.config(state='normal')
 
 
 root = tk.Tk()
@@ -1053,10 +1568,24 @@ text_input = tk.Text(input_frame, height=2, width=80, font=("Consolas", 10))
 text_input.pack(fill="x", pady=(5, 5))
 text_input.insert("1.0", "[poweron, scanarea, moveforward, pickobject]")
 
-btn = tk.Button(input_frame, text="Verify Sequence", command=send_sequence, 
+# Verify controls
+verify_frame = tk.Frame(input_frame)
+verify_frame.pack(pady=5)
+
+btn = tk.Button(verify_frame, text="Verify Sequence", command=send_sequence, 
                 font=("Arial", 11, "bold"), bg="#4CAF50", fg="white", 
                 padx=20, pady=5, cursor="hand2")
-btn.pack(pady=5)
+btn.pack(side="left", padx=5)
+
+cancel_btn = tk.Button(verify_frame, text="Cancel", command=cancel_verification,
+                       font=("Arial", 9), padx=10, pady=2, state='disabled')
+cancel_btn.pack(side="left", padx=5)
+
+verify_progress = ttk.Progressbar(verify_frame, length=200, mode='determinate')
+verify_progress.pack(side="left", padx=5)
+
+verify_status = tk.Label(verify_frame, text="", font=("Arial", 9), width=28, anchor="w")
+verify_status.pack(side="left", padx=5)
 
 # Results section with two columns (top row)
 results_frame = tk.Frame(main_frame)
@@ -1110,8 +1639,16 @@ explanation_text.pack(fill="both", expand=True)
 fsm_frame = tk.LabelFrame(main_frame, text="Warehouse Robot Movement Visualization", font=("Arial", 11, "bold"), padx=10, pady=10)
 fsm_frame.pack(fill="both", expand=True, pady=(0, 15))
 
+# Tabs: warehouse animation and state machine graph
+view_tabs = ttk.Notebook(fsm_frame)
+view_tabs.pack(fill="both", expand=True)
+warehouse_tab = tk.Frame(view_tabs)
+view_tabs.add(warehouse_tab, text="Warehouse")
+fsm_tab = tk.Frame(view_tabs)
+view_tabs.add(fsm_tab, text="State Machine")
+
 # Object placement controls frame
-obj_controls_frame = tk.Frame(fsm_frame)
+obj_controls_frame = tk.Frame(warehouse_tab)
 obj_controls_frame.pack(fill="x", pady=(0, 5))
 
 tk.Label(obj_controls_frame, text="Manual Objects:", font=("Arial", 9)).pack(side="left", padx=5)
@@ -1128,7 +1665,7 @@ obj_count_label = tk.Label(obj_controls_frame, text="Objects: 0", font=("Arial",
 obj_count_label.pack(side="left", padx=10)
 
 # Animation controls frame
-anim_controls_frame = tk.Frame(fsm_frame)
+anim_controls_frame = tk.Frame(warehouse_tab)
 anim_controls_frame.pack(fill="x", pady=(0, 5))
 
 # Animation control buttons
@@ -1152,66 +1689,59 @@ reset_btn = tk.Button(anim_controls_frame, text="⏹ Reset", command=reset_anima
                      padx=15, pady=3, state='disabled', cursor="hand2")
 reset_btn.pack(side="left", padx=5)
 
+# Playback speed (steps per second)
+tk.Label(anim_controls_frame, text="Speed (steps/s):", font=("Arial", 9)).pack(side="left", padx=(15, 2))
+speed_picker = ttk.Combobox(anim_controls_frame, values=ANIMATION_SPEEDS, width=5)
+speed_picker.set("1")
+speed_picker.bind("<<ComboboxSelected>>", on_speed_change)
+speed_picker.bind("<Return>", on_speed_change)
+speed_picker.pack(side="left", padx=2)
+
+# Scrub slider over the steps
+scrub_slider = tk.Scale(anim_controls_frame, from_=1, to=1, orient="horizontal", showvalue=False,
+                        command=on_scrub, state='disabled')
+scrub_slider.pack(side="left", fill="x", expand=True, padx=10)
+
 def show_initial_warehouse():
     """Show initial warehouse state with manual objects."""
-    fsm_ax.clear()
-    
-    # Warehouse grid dimensions
-    grid_width = 10
-    grid_height = 8
-    
-    # Draw base warehouse
-    draw_warehouse_base(fsm_ax, grid_width, grid_height)
-    
-    # Draw robot at starting position
-    robot_x, robot_y = 1.0, 1.0
-    robot = Circle((robot_x, robot_y), 0.35, facecolor='#f44336', 
-                  edgecolor='#c62828', linewidth=3)
-    fsm_ax.add_patch(robot)
-    fsm_ax.text(robot_x, robot_y, '🤖', ha='center', va='center', fontsize=14)
-    
-    # Draw start marker
-    start_mark = Circle((robot_x, robot_y), 0.15, facecolor='#4CAF50', 
-                       edgecolor='#2d8659', linewidth=2)
-    fsm_ax.add_patch(start_mark)
-    fsm_ax.text(robot_x, robot_y - 0.6, 'START', ha='center', va='top', 
-               fontsize=8, fontweight='bold', color='#2d8659')
-    
-    # Draw manual objects if any
-    for obj_x, obj_y in manual_objects:
-        obj_box = Rectangle((obj_x - 0.3, obj_y - 0.3), 0.6, 0.6,
-                          facecolor='#FF9800', edgecolor='#F57C00', linewidth=2)
-        fsm_ax.add_patch(obj_box)
-        fsm_ax.text(obj_x, obj_y, '📦', ha='center', va='center', fontsize=12)
-    
-    # Add legend
+    # The legend depends on the objects, so the static part is redrawn
     from matplotlib.patches import Patch
     legend_elements = [
         Patch(facecolor='#f44336', edgecolor='#c62828', label='Robot (Start)'),
     ]
     if manual_objects:
         legend_elements.append(Patch(facecolor='#FF9800', edgecolor='#F57C00', label='Manual Object'))
-    fsm_ax.legend(handles=legend_elements, loc='upper right', fontsize=8)
-    
     title_text = "Warehouse - Initial State"
     if manual_objects:
         title_text += f" ({len(manual_objects)} object(s))"
-    fsm_ax.set_title(title_text, fontsize=14, fontweight='bold', pad=15)
-    fsm_ax.grid(True, alpha=0.3)
-    fsm_canvas.draw()
+    view = get_warehouse_view(fsm_ax, fsm_canvas)
+    view.build("initial", legend_elements, title_text)
+    
+    # Robot at its starting position, with the manual objects if any
+    objects = [(obj_x, obj_y, "manual") for obj_x, obj_y in manual_objects]
+    view.show((1.0, 1.0), [(1.0, 1.0)], objects, [], [], [])
 
 # Create matplotlib figure
 fig, fsm_ax = plt.subplots(figsize=(12, 6), facecolor='white')
 
 # Embed matplotlib in tkinter
-fsm_canvas = FigureCanvasTkAgg(fig, fsm_frame)
+fsm_canvas = FigureCanvasTkAgg(fig, warehouse_tab)
 fsm_canvas.get_tk_widget().pack(fill="both", expand=True)
 
 # Add navigation toolbar for zoom and pan
-toolbar = NavigationToolbar2Tk(fsm_canvas, fsm_frame)
+toolbar = NavigationToolbar2Tk(fsm_canvas, warehouse_tab)
 toolbar.update()
 toolbar.pack(side="bottom", fill="x")
 
+# State machine graph, filled in by each verification
+fsm_graph_fig, fsm_graph_ax = plt.subplots(figsize=(12, 6), facecolor='white')
+fsm_graph_ax.axis('off')
+fsm_graph_canvas = FigureCanvasTkAgg(fsm_graph_fig, fsm_tab)
+fsm_graph_canvas.get_tk_widget().pack(fill="both", expand=True)
+fsm_graph_toolbar = NavigationToolbar2Tk(fsm_graph_canvas, fsm_tab)
+fsm_graph_toolbar.update()
+fsm_graph_toolbar.pack(side="bottom", fill="x")
+
 # Initialize object count and show initial warehouse
 update_obj_count()
 show_initial_warehouse()  # Show warehouse immediately on startup
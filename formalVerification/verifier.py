@@ -0,0 +1,856 @@
+"""
+Headless verification API.
+
+Verifier runs action sequences against rules.pl in-process, on the
+compiled transition table or on a pool of Prolog engines, and keeps its
+engines and caches between calls. app.py serves it over HTTP; planners
+written in Python can use it directly:
+
+    from verifier import Verifier
+
+    with Verifier() as verifier:
+        verdict = verifier.check(["poweron", "scanarea", "pickobject"])
+        if not verdict.valid:
+            print("fails at step", verdict.first_invalid)
+
+The build_*() functions turn the events of iter_verification() into the
+JSON bodies served by app.py.
+"""
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+from caches import PrefixTrie, TransitionMemo
+from engine import rules_digest
+from prolog_pool import PrologPool, RULES_PATH
+
+logger = logging.getLogger(__name__)
+
+# "table" runs off the compiled transition table, "prolog" is the reference
+# mode that runs the sequence through verify_sequence/2
+ENGINE_MODES = ("table", "prolog")
+
+# Version of the cached artifacts: the TransitionTable layout and the
+# response bodies. Bump it whenever either changes, so ETags and the disk
+# cache from an older release are never served after a deploy.
+FORMAT_VERSION = 1
+
+# Seconds between checks of rules.pl for changes
+RULES_CHECK_INTERVAL = 1.0
+
+# Steps per Prolog query when a fail-fast verdict reads a trace lazily
+FAIL_FAST_CHUNK = 256
+
+# One entry of Verification.steps, with the fields of a /verify
+# "validation" entry (battery is None for unrecognized actions)
+Step = namedtuple(
+    "Step",
+    "action result precondition precondition_met explanation from_state to_state battery",
+    defaults=(None,))
+
+# Result of Verifier.verify(). nodes and edges are the /fsm dicts.
+Verification = namedtuple(
+    "Verification",
+    "valid steps summary summary_details final_state final_battery "
+    "battery_history nodes edges")
+
+# Result of Verifier.check(), see build_verdict()
+Verdict = namedtuple("Verdict", "valid steps invalid_count first_invalid")
+
+# Result of Verifier.fsm()
+FSM = namedtuple("FSM", "nodes edges")
+
+
+def state_to_label(state_set):
+    """Convert state set to a readable label."""
+    if not state_set:
+        return "Initial"
+    # Sort for consistent labeling
+    sorted_states = sorted(state_set)
+    return ", ".join(sorted_states)
+
+
+def auto_expand_sequence(actions, manual_objects=None, robot_start_pos=(1.0, 1.0)):
+    """Automatically add moveforward actions to reach objects.
+    
+    Args:
+        actions: List of action strings
+        manual_objects: List of (x, y) tuples for manually placed objects
+        robot_start_pos: Starting position of robot (x, y)
+    """
+    expanded = []
+    i = 0
+    robot_x, robot_y = robot_start_pos
+    
+    while i < len(actions):
+        expanded.append(actions[i])
+        current = actions[i].strip().lower()
+        
+        # Update robot position based on actions
+        if current == "moveforward":
+            robot_y += 1.5  # Move forward increases Y by 1.5
+        elif current == "moveleft":
+            robot_x -= 1.5  # Move left decreases X by 1.5
+        elif current == "moveright":
+            robot_x += 1.5  # Move right increases X by 1.5
+        
+        # Check if next action is pickobject
+        if i < len(actions) - 1:
+            next_action = actions[i + 1].strip().lower()
+            
+            if next_action == "pickobject":
+                # Check if we have manual objects to reach
+                if manual_objects:
+                    # Find nearest manual object
+                    nearest_obj = None
+                    min_dist = float('inf')
+                    for obj_x, obj_y in manual_objects:
+                        dist = ((obj_x - robot_x)**2 + (obj_y - robot_y)**2)**0.5
+                        if dist < min_dist:
+                            min_dist = dist
+                            nearest_obj = (obj_x, obj_y)
+                    
+                    if nearest_obj:
+                        obj_x, obj_y = nearest_obj
+                        # Calculate movement needed in both X and Y directions
+                        dist_x = obj_x - robot_x
+                        dist_y = obj_y - robot_y
+                        
+                        # Move in X direction first (left/right)
+                        if abs(dist_x) > 0.5:
+                            if dist_x > 0:  # Need to move right
+                                steps_x = max(1, int((dist_x - 1.0) / 1.5) + 1)
+                                for _ in range(min(steps_x, 5)):  # Max 5 steps
+                                    expanded.append("moveright")
+                                    robot_x += 1.5
+                                    if abs(obj_x - robot_x) <= 1.0:
+                                        break
+                            else:  # Need to move left
+                                steps_x = max(1, int((abs(dist_x) - 1.0) / 1.5) + 1)
+                                for _ in range(min(steps_x, 5)):  # Max 5 steps
+                                    expanded.append("moveleft")
+                                    robot_x -= 1.5
+                                    if abs(obj_x - robot_x) <= 1.0:
+                                        break
+                        
+                        # Then move in Y direction (forward)
+                        if dist_y > 0.5:  # Need to move forward
+                            steps_y = max(1, int((dist_y - 1.0) / 1.5) + 1)
+                            for _ in range(min(steps_y, 5)):  # Max 5 steps
+                                expanded.append("moveforward")
+                                robot_y += 1.5
+                                if abs(obj_y - robot_y) <= 1.0:
+                                    break
+                elif current == "scanarea":
+                    # Original behavior: add movement after scanarea if no manual objects
+                    expanded.append("moveforward")
+                    expanded.append("moveforward")
+        
+        i += 1
+    return expanded
+
+
+def table_trace(table, action_atoms, world=None):
+    """Verify a sequence on the compiled transition table, lazily.
+
+    Starts from the world mask `world`, or the initial world if None.
+    """
+    if world is None:
+        world = table.initial_world
+    for action_atom in action_atoms:
+        result, preconditions, missing, world = table.step(world, action_atom)
+        yield action_atom, result, preconditions, missing, world
+
+
+# Everything iter_verification() needs to carry on after a step. new_node
+# is (world, node id) if the step reached a world for the first time.
+Checkpoint = namedtuple(
+    "Checkpoint", "world battery node_counter steps invalid_count new_node")
+
+
+def initial_checkpoint(table):
+    """Checkpoint before the first step, after the initial FSM node."""
+    world = table.initial_world
+    return Checkpoint(world, 100, 1, 0, 0, (world, 0))
+
+
+def iter_verification(table, world, trace, resume=None):
+    """Walk a trace (see table_trace()) and yield the /verify data as events.
+
+    Yields ("node", fsm_node) whenever a world is first reached,
+    ("step", result, fsm_edge, checkpoint) once per action (fsm_edge is
+    None for unrecognized actions) and finally ("summary", summary). Only
+    the world-to-node map is kept, so memory does not grow with the
+    sequence.
+
+    Args:
+        resume: Optional (checkpoint, state_id_map) to continue a
+            verification from instead of starting at `world`
+    """
+    if resume is None:
+        step_count = 0
+        invalid_count = 0
+        
+        # Battery tracking
+        battery_level = 100
+        
+        # FSM tracking
+        current_state = world  # Start with initial world state
+        state_id_map = {}  # Map world masks to node IDs
+        node_counter = 0
+        
+        # Create initial state node
+        initial_label = state_to_label(table.state_list(current_state))
+        state_id_map[current_state] = node_counter
+        yield "node", {
+            "id": node_counter,
+            "label": f"S{node_counter}: {initial_label}",
+            "state": table.state_list(current_state),
+            "step": 0,
+            "type": "initial"
+        }
+        node_counter += 1
+    else:
+        checkpoint, state_id_map = resume
+        current_state = checkpoint.world
+        battery_level = checkpoint.battery
+        node_counter = checkpoint.node_counter
+        step_count = checkpoint.steps
+        invalid_count = checkpoint.invalid_count
+
+    for step, (action_atom, result, preconditions, missing_preconditions, world) in enumerate(trace, step_count + 1):
+        from_state_id = state_id_map.get(current_state)
+        step_count += 1
+        new_node = None
+        
+        # Store state BEFORE action (for from_state in results)
+        from_state_list = table.state_list(current_state)
+        
+        if result == "invalid_action":
+            # Invalid action - state doesn't change
+            invalid_count += 1
+            yield "step", {
+                "action": action_atom,
+                "result": "invalid_action",
+                "precondition": "N/A",
+                "precondition_met": False,
+                "explanation": f"'{action_atom}' is not a recognized action. Valid actions are: scanarea, moveforward, pickobject.",
+                "from_state": from_state_list,
+                "to_state": from_state_list  # State doesn't change
+            }, None, Checkpoint(current_state, battery_level, node_counter,
+                                step_count, invalid_count, None)
+            continue
+        
+        # Check which preconditions are met
+        all_preconditions_met = len(missing_preconditions) == 0
+        
+        # Build explanation
+        if result == "valid":
+            if preconditions:
+                explanation = f"Action '{action_atom}' is valid. All preconditions satisfied: {', '.join(preconditions)}."
+            else:
+                explanation = f"Action '{action_atom}' is valid."
+        elif result == "precondition_failed":
+            if missing_preconditions:
+                explanation = f"Action '{action_atom}' failed. Missing preconditions: {', '.join(missing_preconditions)}."
+            else:
+                explanation = f"Action '{action_atom}' failed: One or more preconditions are not satisfied."
+        elif result == "invalid_action":
+            explanation = f"'{action_atom}' is not a recognized action."
+        else:
+            explanation = f"Action '{action_atom}' resulted in error: {result}."
+        
+        # Get state after action
+        new_state = world
+        
+        # Battery tracking
+        if result == "valid":
+            if action_atom in ["moveforward", "moveleft", "moveright", "turnleft", "turnright"]:
+                battery_level = max(0, battery_level - 20)
+            elif action_atom in ["scanarea", "pickobject", "releaseobject"]:
+                battery_level = max(0, battery_level - 10)
+            # poweron, poweroff, checkbattery, stop -> no drain
+        
+        # Update current_state for FSM tracking
+        current_state = new_state
+        
+        # Create or get state node
+        state_key = new_state
+        if state_key not in state_id_map:
+            state_id_map[state_key] = node_counter
+            new_node = (state_key, node_counter)
+            state_label = state_to_label(table.state_list(new_state))
+            yield "node", {
+                "id": node_counter,
+                "label": f"S{node_counter}: {state_label}",
+                "state": table.state_list(new_state),
+                "step": step,
+                "type": "valid" if result == "valid" else "invalid"
+            }
+            node_counter += 1
+        
+        to_state_id = state_id_map[state_key]
+        
+        # Create edge
+        edge = {
+            "from": from_state_id,
+            "to": to_state_id,
+            "label": action_atom,
+            "action": action_atom,
+            "step": step,
+            "valid": result == "valid",
+            "precondition": ", ".join(preconditions) if preconditions else "N/A"
+        }
+        
+        # Store state after transition for result
+        to_state_list = table.state_list(new_state)
+        
+        if result != "valid":
+            invalid_count += 1
+
+        yield "step", {
+            "action": action_atom,
+            "result": result,
+            "precondition": ", ".join(preconditions) if preconditions else "N/A",
+            "precondition_met": all_preconditions_met,
+            "explanation": explanation,
+            "from_state": from_state_list,
+            "to_state": to_state_list,
+            "battery": battery_level
+        }, edge, Checkpoint(current_state, battery_level, node_counter,
+                            step_count, invalid_count, new_node)
+            
+    all_valid = invalid_count == 0
+    summary = "VALID SEQUENCE" if all_valid else "INVALID SEQUENCE"
+    summary_details = f"All {step_count} actions are valid." if all_valid else f"Found {invalid_count} invalid action(s) in the sequence."
+    final_state = table.state_list(current_state)
+
+    yield "summary", {
+        "summary": summary,
+        "summary_details": summary_details,
+        "final_state": final_state,
+        "final_battery": battery_level
+    }
+
+
+def build_verification(events):
+    """Build the /verify response body from iter_verification() events."""
+    results = []
+    battery_history = []
+    fsm_nodes = []
+    fsm_edges = []
+    for event in events:
+        if event[0] == "step":
+            _, result, edge, _ = event
+            results.append(result)
+            if edge is not None:
+                fsm_edges.append(edge)
+                battery_history.append(result["battery"])
+        elif event[0] == "node":
+            fsm_nodes.append(event[1])
+        else:
+            summary = event[1]
+
+    return {
+        "validation": results, 
+        "summary": summary["summary"],
+        "summary_details": summary["summary_details"],
+        "final_state": summary["final_state"],
+        "final_battery": summary["final_battery"],
+        "battery_history": battery_history,
+        "fsm": {
+            "nodes": fsm_nodes,
+            "edges": fsm_edges
+        }
+    }
+
+
+def build_fsm(events):
+    """Build the /fsm response body from iter_verification() events."""
+    fsm_nodes = []
+    fsm_edges = []
+    for event in events:
+        if event[0] == "node":
+            fsm_nodes.append(event[1])
+        elif event[0] == "step" and event[2] is not None:
+            fsm_edges.append(event[2])
+    return {
+        "nodes": fsm_nodes,
+        "edges": fsm_edges
+    }
+
+
+def build_compact(events, explain=False):
+    """Build the compact /verify body from iter_verification() events.
+
+    Condition and action names are interned into the "conditions" and
+    "actions" tables and referred to by index. Each step is
+    [action, result, added, removed, precondition_met, battery] where added
+    and removed are the conditions that changed. Explanations are only
+    included (as a list, one per step) if `explain` is set.
+    """
+    conditions = []
+    condition_index = {}
+    actions = []
+    preconditions = []
+    action_index = {}
+    result_index = {}
+    results = []
+
+    def intern_conds(conds):
+        ids = []
+        for cond in conds:
+            i = condition_index.get(cond)
+            if i is None:
+                i = condition_index[cond] = len(conditions)
+                conditions.append(cond)
+            ids.append(i)
+        return ids
+
+    steps = []
+    explanations = []
+    nodes = []
+    edges = []
+    initial_state = None
+    for event in events:
+        if event[0] == "step":
+            _, result, edge, _ = event
+            a = action_index.get(result["action"])
+            if a is None:
+                a = action_index[result["action"]] = len(actions)
+                actions.append(result["action"])
+                preconditions.append(result["precondition"])
+            r = result_index.get(result["result"])
+            if r is None:
+                r = result_index[result["result"]] = len(results)
+                results.append(result["result"])
+            from_state = set(result["from_state"])
+            to_state = set(result["to_state"])
+            steps.append([
+                a,
+                r,
+                intern_conds(sorted(to_state - from_state)),
+                intern_conds(sorted(from_state - to_state)),
+                result["precondition_met"],
+                result.get("battery")
+            ])
+            if explain:
+                explanations.append(result["explanation"])
+            if edge is not None:
+                edges.append([edge["from"], edge["to"], a, edge["step"], edge["valid"]])
+        elif event[0] == "node":
+            node = event[1]
+            if initial_state is None:
+                initial_state = intern_conds(node["state"])
+            nodes.append([node["id"], node["step"], node["type"],
+                          intern_conds(node["state"])])
+        else:
+            summary = event[1]
+
+    body = {
+        "format": "compact",
+        "conditions": conditions,
+        "actions": actions,
+        "preconditions": preconditions,
+        "results": results,
+        "initial_state": initial_state,
+        "steps": steps,
+        "summary": summary["summary"],
+        "summary_details": summary["summary_details"],
+        "final_state": intern_conds(summary["final_state"]),
+        "final_battery": summary["final_battery"],
+        "fsm": {
+            "nodes": nodes,
+            "edges": edges
+        }
+    }
+    if explain:
+        body["explanations"] = explanations
+    return body
+
+
+def build_verdict(trace, fail_fast=False):
+    """Summarize a trace as a verdict, without explanations or FSM data.
+
+    With fail_fast the trace is only read up to its first invalid step, so
+    "steps" and "invalid_count" cover that prefix only.
+    """
+    steps = 0
+    invalid_count = 0
+    first_invalid = None
+    for index, (_, result, _, _, _) in enumerate(trace):
+        steps += 1
+        if result != "valid":
+            invalid_count += 1
+            if first_invalid is None:
+                first_invalid = index
+            if fail_fast:
+                break
+    return {
+        "valid": invalid_count == 0,
+        "steps": steps,
+        "invalid_count": invalid_count,
+        "first_invalid": first_invalid
+    }
+
+
+class Verifier:
+    """In-process verifier with reusable engines and caches.
+
+    The Prolog pool and the transition table are started on first use and
+    rebuilt when rules.pl changes on disk. Thread-safe; call close() (or
+    use it as a context manager) to stop the Prolog workers.
+
+    Args:
+        rules_path: Rules file to verify against
+        engine: Default engine, "table" or "prolog"
+        workers: Number of Prolog worker processes (defaults to one per core)
+        memo_size: Transitions kept by the Prolog engines' memo
+        trie_nodes: Verified steps kept in the prefix trie
+        disk_cache: Optional DiskCache to keep compiled tables in
+    """
+
+    def __init__(self, rules_path=RULES_PATH, engine="table", workers=None,
+                 memo_size=4096, trie_nodes=20000, disk_cache=None):
+        if engine not in ENGINE_MODES:
+            raise ValueError(f"Engine must be one of: {', '.join(ENGINE_MODES)}")
+        self.rules_path = rules_path
+        self.engine = engine
+        self.workers = workers
+        self.disk_cache = disk_cache
+        self.transition_memo = TransitionMemo(memo_size)
+        self.prefix_trie = PrefixTrie(trie_nodes)
+
+        # Created on first use so that spawned pool workers, which re-import
+        # the server module on Windows, do not start pools of their own
+        self._pool = None
+        self._table = None
+        self._rules_stamp = None
+        self._next_rules_check = 0.0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def release_pool(self):
+        """Stop the Prolog workers but keep the compiled table.
+
+        Call before forking server processes: each child then starts its
+        own Prolog workers on first use and shares the table copy-on-write.
+        """
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def close(self):
+        """Stop the Prolog workers."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+                self._table = None
+
+    # -- engines ---------------------------------------------------------
+
+    def rules_stamp(self):
+        """Cheap change marker for rules.pl (modification time and size)."""
+        st = os.stat(self.rules_path)
+        return st.st_mtime_ns, st.st_size
+
+    def _load_engines(self):
+        """(Re)start the Prolog pool and compile the transition table.
+
+        Must be called with _lock held.
+        """
+        stamp = self.rules_stamp()
+        if self._pool is not None:
+            # Let in-flight queries and lazy traces finish on the old engines
+            self._pool.retire()
+        self._pool = PrologPool(self.workers, self.rules_path)
+        self._rules_stamp = stamp
+
+        if self.disk_cache is not None:
+            table = self.disk_cache.get_table(rules_digest(self.rules_path))
+            if table is not None:
+                self._table = table
+                logger.info("Loaded compiled rules.pl from %s", self.disk_cache.path)
+                return
+        self._table = self._pool.compile_table()
+        logger.info("Compiled rules.pl: %d reachable states, %d actions",
+                    len(self._table.states), len(self._table.actions))
+        if self.disk_cache is not None:
+            # Forget results computed under older rules
+            self.disk_cache.put_table(self._table)
+            self.disk_cache.compact(self._table.rules_version)
+
+    def engines(self):
+        """Return (pool, table), reloading both if rules.pl changed.
+
+        Use the pair together for one verification, so world masks always
+        belong to the table they were computed with.
+        """
+        now = time.monotonic()
+        if self._pool is not None and now < self._next_rules_check:
+            return self._pool, self._table
+        with self._lock:
+            if self._table is None or self.rules_stamp() != self._rules_stamp:
+                self._load_engines()
+            elif self._pool is None:
+                # After release_pool(), keep the table and start new engines
+                self._pool = PrologPool(self.workers, self.rules_path)
+            self._next_rules_check = now + RULES_CHECK_INTERVAL
+            return self._pool, self._table
+
+    def acquire_engines(self):
+        """engines(), with the pool acquired so a reload cannot shut it down.
+
+        Call pool.release() once done with it. If a reload retires the pool
+        in between, the new pool and table are taken instead.
+        """
+        pool, table = self.engines()
+        while not pool.acquire():
+            pool, table = self.engines()
+        return pool, table
+
+    @property
+    def table(self):
+        """The compiled transition table, recompiled if rules.pl changed."""
+        return self.engines()[1]
+
+    # -- traces ----------------------------------------------------------
+
+    def prolog_traces(self, pool, table, sequences, worlds=None):
+        """Verify sequences on the Prolog engines through the transition memo.
+
+        Each sequence is replayed from the memo as far as it goes, then the
+        remaining suffixes are sent to the pool in one batch and their steps
+        are added to the memo. `worlds` optionally gives the start world mask
+        of each sequence. Returns one trace list per sequence. The caller
+        holds `pool`, see acquire_engines().
+        """
+        memo = self.transition_memo
+        memo.check_version(table.rules_version)
+        if worlds is None:
+            worlds = [table.initial_world] * len(sequences)
+        traces = []
+        pending = []  # (trace index, world, remaining actions)
+        for action_atoms, world in zip(sequences, worlds):
+            trace = []
+            for i, action_atom in enumerate(action_atoms):
+                hit = memo.get(world, action_atom)
+                if hit is None:
+                    pending.append((len(traces), world, action_atoms[i:]))
+                    break
+                result, preconditions, missing, world = hit
+                trace.append((action_atom, result, preconditions, missing, world))
+            traces.append(trace)
+
+        if pending:
+            suffixes = pool.trace_many(
+                [actions for _, _, actions in pending],
+                [table.state_list(world) for _, world, _ in pending])
+            for (index, world, _), (_, suffix) in zip(pending, suffixes):
+                for action_atom, result, preconditions, missing, names in suffix:
+                    new_world = table.encode(names)
+                    memo.put(world, action_atom,
+                             (result, preconditions, missing, new_world))
+                    traces[index].append((action_atom, result, preconditions, missing, new_world))
+                    world = new_world
+        return traces
+
+    def prolog_chunked_trace(self, pool, table, action_atoms, chunk=FAIL_FAST_CHUNK):
+        """Verify a sequence on the Prolog engines a chunk at a time, lazily.
+
+        Later chunks are only sent once the caller has read the earlier ones,
+        so a fail-fast caller stops paying for the sequence at its first
+        failing chunk. The caller must have acquired `pool`; it is released
+        once the trace is exhausted or closed.
+        """
+        try:
+            world = table.initial_world
+            for start in range(0, len(action_atoms), chunk):
+                part = self.prolog_traces(pool, table, [action_atoms[start:start + chunk]], [world])[0]
+                yield from part
+                if part:
+                    world = part[-1][4]
+        finally:
+            pool.release()
+
+    def prolog_chunked_traces(self, pool, table, sequences, chunk=FAIL_FAST_CHUNK):
+        """Verify sequences on the Prolog engines a chunk at a time, for fail-fast.
+
+        Each round sends the next chunk of every sequence that has no
+        invalid step yet in one batch, so sequences stop costing queries at
+        their first failing chunk while the pool still works on the rest.
+        """
+        traces = [[] for _ in sequences]
+        worlds = [table.initial_world] * len(sequences)
+        pending = [i for i, actions in enumerate(sequences) if actions]
+        start = 0
+        while pending:
+            parts = self.prolog_traces(
+                pool, table, [sequences[i][start:start + chunk] for i in pending],
+                [worlds[i] for i in pending])
+            still = []
+            for i, part in zip(pending, parts):
+                traces[i].extend(part)
+                worlds[i] = part[-1][4]
+                if (start + chunk < len(sequences[i])
+                        and all(entry[1] == "valid" for entry in part)):
+                    still.append(i)
+            pending = still
+            start += chunk
+        return traces
+
+    def trace(self, action_atoms, engine=None, lazy=False):
+        """Verify a sequence from the initial world.
+
+        Returns (table, trace) where trace yields one
+        (action, result, preconditions, missing, world) entry per action
+        and worlds are masks of `table`. With `lazy`, the Prolog engine is
+        queried a chunk at a time as the trace is read.
+        """
+        engine = engine or self.engine
+        if engine != "prolog":
+            table = self.engines()[1]
+            return table, table_trace(table, action_atoms)
+        pool, table = self.acquire_engines()
+        if lazy:
+            return table, self.prolog_chunked_trace(pool, table, action_atoms)
+        try:
+            return table, self.prolog_traces(pool, table, [action_atoms])[0]
+        finally:
+            pool.release()
+
+    def traces(self, sequences, engine=None, fail_fast=False):
+        """Verify several sequences, spread over the whole pool on "prolog".
+
+        Returns (table, [trace, ...]), see trace(). With `fail_fast`, a
+        trace may stop after the chunk holding its first invalid step.
+        """
+        engine = engine or self.engine
+        if engine != "prolog":
+            table = self.engines()[1]
+            return table, [table_trace(table, actions) for actions in sequences]
+        pool, table = self.acquire_engines()
+        try:
+            if fail_fast:
+                return table, self.prolog_chunked_traces(pool, table, sequences)
+            return table, self.prolog_traces(pool, table, sequences)
+        finally:
+            pool.release()
+
+    def events(self, action_atoms, engine=None):
+        """Yield the iter_verification() events for a sequence, via the prefix trie.
+
+        Replays the longest already-verified prefix of the sequence from the
+        trie, resumes verification from its checkpoint and adds the newly
+        verified steps to the trie. Only the first max_nodes steps are added,
+        so one long sequence cannot push the trie (or the path kept for it)
+        past its cap before the request ends.
+        """
+        engine = engine or self.engine
+        if engine != "prolog":
+            yield from self._events(self.engines()[1], None, action_atoms, engine)
+            return
+        pool, table = self.acquire_engines()
+        try:
+            yield from self._events(table, pool, action_atoms, engine)
+        finally:
+            pool.release()
+
+    def _events(self, table, pool, action_atoms, engine):
+        trie = self.prefix_trie
+
+        def make_root():
+            events = [next(iter_verification(table, table.initial_world, ()))]
+            return events, initial_checkpoint(table)
+
+        path = trie.lookup(table.rules_version, engine, action_atoms, make_root)
+        try:
+            # Replay the cached prefix and rebuild the world-to-node map
+            state_id_map = {}
+            for node in path:
+                yield from node.events
+                if node.checkpoint.new_node is not None:
+                    node_world, node_id = node.checkpoint.new_node
+                    state_id_map[node_world] = node_id
+
+            checkpoint = path[-1].checkpoint
+            rest = action_atoms[len(path) - 1:]
+            if engine == "prolog":
+                trace = self.prolog_traces(pool, table, [rest], [checkpoint.world])[0]
+            else:
+                trace = table_trace(table, rest, checkpoint.world)
+
+            events = []  # events of the step being verified
+            for event in iter_verification(table, checkpoint.world, trace,
+                                           resume=(checkpoint, state_id_map)):
+                yield event
+                if event[0] == "node":
+                    events.append(event)
+                elif event[0] == "step":
+                    events.append(event)
+                    if len(path) < trie.max_nodes:
+                        path.append(trie.insert(path[-1], event[1]["action"],
+                                                events, event[3]))
+                    events = []
+        finally:
+            trie.touch(path)
+
+    # -- typed results ---------------------------------------------------
+
+    def expand(self, actions, manual_objects=None, auto_expand=False):
+        """Normalize action names, auto-expanding them like /verify can."""
+        if auto_expand:
+            actions = auto_expand_sequence(actions, manual_objects=manual_objects)
+        return [a.strip().lower() for a in actions]
+
+    def verify(self, actions, engine=None, manual_objects=None, auto_expand=False):
+        """Verify a sequence and return a Verification.
+
+        The same data as a /verify response, with Step tuples for the
+        "validation" entries.
+        """
+        body = build_verification(
+            self.events(self.expand(actions, manual_objects, auto_expand), engine))
+        return Verification(
+            valid=body["summary"] == "VALID SEQUENCE",
+            steps=[Step(**result) for result in body["validation"]],
+            summary=body["summary"],
+            summary_details=body["summary_details"],
+            final_state=body["final_state"],
+            final_battery=body["final_battery"],
+            battery_history=body["battery_history"],
+            nodes=body["fsm"]["nodes"],
+            edges=body["fsm"]["edges"])
+
+    def check(self, actions, engine=None, fail_fast=False, manual_objects=None,
+              auto_expand=False):
+        """Verify a sequence and return only its Verdict.
+
+        Skips explanations and FSM data. With fail_fast, stops at the first
+        invalid step.
+        """
+        _, trace = self.trace(self.expand(actions, manual_objects, auto_expand),
+                              engine, lazy=fail_fast)
+        return Verdict(**build_verdict(trace, fail_fast))
+
+    def fsm(self, actions, engine=None, manual_objects=None, auto_expand=False):
+        """Verify a sequence and return its FSM nodes and edges."""
+        body = build_fsm(
+            self.events(self.expand(actions, manual_objects, auto_expand), engine))
+        return FSM(body["nodes"], body["edges"])
+
+    def stats(self):
+        """Cache counters, for sizing the caches."""
+        return {
+            "transition_memo": self.transition_memo.stats(),
+            "prefix_trie": self.prefix_trie.stats()
+        }
@@ -0,0 +1,219 @@
+"""
+Command-line batch verifier for saved action sequences.
+
+Verifies the .txt files written by the UI's "Save Sequence" (one action
+per line) across a pool of worker processes, without the Flask server.
+The rules are compiled once up front and every worker starts with a copy
+of the transition table, or with its own Prolog engine for
+--engine prolog.
+
+Usage:
+    python verify_files.py sequences/ more/*.txt --workers 8 --fail-fast
+    python verify_files.py sequences/ --format junit --output report.xml
+
+Exits with 0 if every sequence is valid, 1 if any is invalid or could not
+be read.
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import PrologQueryError, prolog_trace, rules_digest
+from prolog_pool import RULES_PATH
+from verifier import FAIL_FAST_CHUNK, Verifier, auto_expand_sequence, build_verdict, table_trace
+
+# Set in each worker process by _init_worker()
+_table = None
+_prolog = None
+
+
+def _init_worker(table, rules_path):
+    """Load the table, or start a Prolog engine if there is none."""
+    global _table, _prolog
+    _table = table
+    if table is None:
+        from pyswip import Prolog
+        _prolog = Prolog()
+        _prolog.consult(rules_path)
+
+
+def _prolog_results(action_atoms, fail_fast):
+    """Yield trace entries from this worker's engine, a chunk at a time."""
+    world = None
+    for start in range(0, len(action_atoms), FAIL_FAST_CHUNK):
+        _, part = prolog_trace(_prolog, action_atoms[start:start + FAIL_FAST_CHUNK], world)
+        yield from part
+        world = part[-1][4]
+        if fail_fast and any(entry[1] != "valid" for entry in part):
+            return
+
+
+def read_sequence(path):
+    """Read a saved sequence: one action per line, blank lines ignored."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def verify_file(path, fail_fast=False, auto_expand=False):
+    """Verify one sequence file in a worker and return its result dict."""
+    start = time.perf_counter()
+    result = {"file": path}
+    try:
+        actions = read_sequence(path)
+    except (OSError, UnicodeDecodeError) as e:
+        result["error"] = f"Could not read file: {e}"
+        result["time"] = time.perf_counter() - start
+        return result
+
+    if auto_expand:
+        actions = auto_expand_sequence(actions)
+    action_atoms = [a.strip().lower() for a in actions]
+    if _table is not None:
+        trace = table_trace(_table, action_atoms)
+    else:
+        trace = _prolog_results(action_atoms, fail_fast)
+
+    # Keep the first failing entry for the report
+    failure = []
+
+    def watch(trace):
+        for entry in trace:
+            if entry[1] != "valid" and not failure:
+                failure.append(entry)
+            yield entry
+
+    try:
+        result.update(build_verdict(watch(trace), fail_fast))
+    except PrologQueryError as e:
+        result["error"] = str(e)
+        result["time"] = time.perf_counter() - start
+        return result
+    if failure:
+        result["first_invalid_action"] = failure[0][0]
+        result["first_invalid_result"] = failure[0][1]
+    result["time"] = time.perf_counter() - start
+    return result
+
+
+def collect_files(patterns):
+    """Expand files, directories (all .txt files below) and glob patterns."""
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for dirpath, _, names in os.walk(pattern):
+                files.extend(os.path.join(dirpath, n) for n in names if n.endswith(".txt"))
+        elif os.path.isfile(pattern):
+            files.append(pattern)
+        else:
+            files.extend(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+    # Sorted and deduplicated so reports are stable
+    return sorted(set(files))
+
+
+def json_report(results, summary):
+    return json.dumps({**summary, "results": results}, indent=2)
+
+
+def junit_report(results, summary):
+    """Format results as a JUnit XML report, one test case per file."""
+    suite = ET.Element("testsuite", {
+        "name": "formal-verification",
+        "tests": str(summary["count"]),
+        "failures": str(summary["invalid_count"]),
+        "errors": str(summary["error_count"]),
+        "time": f"{summary['time']:.3f}",
+    })
+    props = ET.SubElement(suite, "properties")
+    for name in ("engine", "rules_version"):
+        ET.SubElement(props, "property", {"name": name, "value": str(summary[name])})
+
+    for result in results:
+        path = result["file"]
+        case = ET.SubElement(suite, "testcase", {
+            "classname": os.path.dirname(path) or ".",
+            "name": os.path.basename(path),
+            "time": f"{result['time']:.3f}",
+        })
+        if "error" in result:
+            ET.SubElement(case, "error", {"message": result["error"]})
+        elif not result["valid"]:
+            message = (f"Step {result['first_invalid'] + 1} "
+                       f"'{result['first_invalid_action']}': {result['first_invalid_result']}")
+            failure = ET.SubElement(case, "failure", {"message": message})
+            failure.text = (f"{result['invalid_count']} invalid action(s) "
+                            f"in {result['steps']} checked step(s)")
+    ET.indent(suite)
+    return ET.tostring(suite, encoding="unicode", xml_declaration=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify saved action sequence files.")
+    parser.add_argument("paths", nargs="+", help="Sequence files, directories or glob patterns")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: one per core)")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="Stop each sequence at its first invalid step")
+    parser.add_argument("--auto-expand", action="store_true",
+                        help="Add movement before pickobject like the UI does")
+    parser.add_argument("--engine", choices=("table", "prolog"), default="table",
+                        help="Verify on the compiled table (default) or on Prolog")
+    parser.add_argument("--format", choices=("json", "junit"), default="json",
+                        help="Report format (default: json)")
+    parser.add_argument("--output", help="Write the report here instead of stdout")
+    parser.add_argument("--rules", default=RULES_PATH, help="Rules file to verify against")
+    args = parser.parse_args(argv)
+    # Progress goes to stderr so the report can go to stdout
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    files = collect_files(args.paths)
+    if not files:
+        parser.error("no sequence files found")
+
+    start = time.perf_counter()
+    table = None
+    if args.engine == "table":
+        # Compile once here; workers get a copy instead of a Prolog engine
+        with Verifier(rules_path=args.rules, workers=1) as verifier:
+            table = verifier.table
+
+    workers = max(1, args.workers or os.cpu_count() or 1)
+    workers = min(workers, len(files))
+    # Big enough chunks to keep the workers busy without much pickling
+    chunksize = max(1, len(files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(table, args.rules)) as executor:
+        results = list(executor.map(verify_file, files,
+                                    [args.fail_fast] * len(files),
+                                    [args.auto_expand] * len(files),
+                                    chunksize=chunksize))
+
+    errors = sum(1 for r in results if "error" in r)
+    valid = sum(1 for r in results if r.get("valid"))
+    summary = {
+        "engine": args.engine,
+        "rules_version": rules_digest(args.rules),
+        "count": len(results),
+        "valid_count": valid,
+        "invalid_count": len(results) - valid - errors,
+        "error_count": errors,
+        "time": time.perf_counter() - start,
+    }
+    report = junit_report(results, summary) if args.format == "junit" else json_report(results, summary)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+    print(f"{summary['count']} sequences: {valid} valid, {summary['invalid_count']} invalid, "
+          f"{errors} errors in {summary['time']:.2f}s", file=sys.stderr)
+    return 0 if valid == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())